@@ -2,11 +2,11 @@
 
 import uuid
 from datetime import datetime
-from decimal import Decimal
-from typing import Optional
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
 from sqlalchemy import String, Text, Numeric, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from geoalchemy2 import Geometry
 from app.database import Base
 
@@ -123,5 +123,25 @@ class AuctionObject(Base):
         back_populates="auction_objects"
     )
     
+    @validates("latitude", "longitude")
+    def validate_coordinate(self, key: str, value: Any) -> Optional[Decimal]:
+        """Reject coordinates outside the WGS84 range before they reach the database.
+        
+        The SHAB feed hands coordinates over as strings, so values are
+        converted to Decimal before the range check.
+        """
+        if value is None:
+            return None
+        
+        try:
+            coordinate = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"{key} {value!r} is not a number") from None
+        
+        limit = 90 if key == "latitude" else 180
+        if not coordinate.is_finite() or not -limit <= coordinate <= limit:
+            raise ValueError(f"{key} {value} is outside [-{limit}, {limit}]")
+        return coordinate
+    
     def __repr__(self) -> str:
         return f"<AuctionObject(id={self.id}, parcel='{self.parcel_number}', value={self.estimated_value})>"
@@ -5,7 +5,7 @@ from datetime import datetime, date
 from typing import Optional, Dict, Any
 from sqlalchemy import String, Date, DateTime, ForeignKey, Enum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from app.database import Base
 import enum
 
@@ -112,6 +112,11 @@ class Debtor(Base):
         back_populates="debtors"
     )
     
+    @validates("debtor_type")
+    def validate_debtor_type(self, key: str, value: str) -> DebtorType:
+        """Coerce the debtor type to DebtorType, raising ValueError if unknown."""
+        return DebtorType(value)
+    
     @property
     def full_name(self) -> str:
         """Get full name combining prename and name."""
@@ -1,22 +1,56 @@
 """SHAB XML parser for Swiss auction publications."""
 
 import re
+import threading
 import uuid
 from datetime import datetime, date, time as dt_time
 from decimal import Decimal
 from typing import List, Dict, Optional, Any
 from xml.etree import ElementTree as ET
 from bs4 import BeautifulSoup
+import httpx
 from lxml import etree
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is a speed-up only; the stdlib decoder gives the same result
+    from json import loads as json_loads
+
 from app.config import settings
 from app.models import Publication, Auction, Debtor, AuctionObject, Contact
 
+# Language children of the first <title>, compiled once for every publication
+_XP_TITLE_LANGUAGES = etree.XPath('(.//title)[1]/*[self::de or self::en or self::it or self::fr]')
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Pooled client shared by parsers that were not given one; created on first fetch
+_shared_client: Optional[httpx.Client] = None
+_shared_client_lock = threading.Lock()
+
+
+def _get_shared_client() -> httpx.Client:
+    """Return the module-wide HTTP client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None:
+        # Fetches run in worker threads (asyncio.to_thread), so only one may create it
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = httpx.Client()
+    return _shared_client
+
 
 class SHABParser:
     """Parser for SHAB XML files containing auction information."""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.Client] = None):
+        self._client = client
+        # lxml parsers must not be shared between threads, so each instance gets its own
+        self._xml_parser = etree.XMLParser(
+            remove_blank_text=True,
+            resolve_entities=False,
+            no_network=True
+        )
         self.namespaces = {
             'SB01': 'https://shab.ch/shab/SB01-export',
             'sb': 'https://shab.ch/shab/SB01-export',
@@ -24,6 +58,11 @@ class SHABParser:
             'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
         }
     
+    @property
+    def client(self) -> httpx.Client:
+        """HTTP client used for fetches; keeps connections alive between calls."""
+        return self._client or _get_shared_client()
+    
     def fetch_xml_data(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> str:
         """Fetch XML data from SHAB API."""
         url = f"{settings.shab_base_url}/shab"
@@ -34,25 +73,32 @@ class SHABParser:
         if date_to:
             params['dateTo'] = date_to.isoformat()
         
-        import httpx
-        with httpx.Client() as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            return response.text
+        response = self.client.get(url, params=params)
+        response.raise_for_status()
+        return response.text
     
     def fetch_url_data(self, url: str) -> str:
         """Fetch data from a specific URL."""
-        import httpx
-        with httpx.Client() as client:
-            response = client.get(url)
-            response.raise_for_status()
-            return response.text
+        response = self.client.get(url)
+        response.raise_for_status()
+        return response.text
+    
+    def parse_document(self, xml_content: str) -> etree._Element:
+        """Parse an XML document, dropping whitespace-only text nodes."""
+        return etree.fromstring(xml_content.encode('utf-8'), self._xml_parser)
     
-    def parse_xml(self, xml_content: str, html_url: str = None) -> List[Dict[str, Any]]:
-        """Parse SHAB XML content and extract auction data."""
+    def parse_xml(self, xml_content: str, html_url: str = None, contacts_json: str = None,
+                  root: Optional[etree._Element] = None) -> List[Dict[str, Any]]:
+        """Parse SHAB XML content and extract auction data.
+        
+        Contacts come from ``contacts_json`` when the caller already fetched it
+        (see ``get_contacts_json_url``); otherwise they are fetched via ``html_url``.
+        Pass ``root`` if the document was already parsed to avoid parsing it twice.
+        """
         try:
             # Parse XML with lxml for better namespace handling
-            root = etree.fromstring(xml_content.encode('utf-8'))
+            if root is None:
+                root = self.parse_document(xml_content)
             
             publications = []
             
@@ -61,10 +107,7 @@ class SHABParser:
             for pub_elem in root.xpath('//SB01:publication | //sb:publication', namespaces=self.namespaces):
                 publication_data = self._parse_publication(pub_elem)
                 if publication_data:
-                    # Parse contacts from HTML page if URL provided
-                    if html_url:
-                        contacts = self._parse_contacts_from_html_page(html_url)
-                        publication_data['contacts'] = contacts
+                    self._attach_contacts(publication_data, html_url, contacts_json)
                     publications.append(publication_data)
             
             # Method 2: If no publication elements found, try to parse the root as a single publication
@@ -73,20 +116,14 @@ class SHABParser:
                 if root.tag.endswith('publication') or 'publication' in root.tag.lower():
                     publication_data = self._parse_publication(root)
                     if publication_data:
-                        # Parse contacts from HTML page if URL provided
-                        if html_url:
-                            contacts = self._parse_contacts_from_html_page(html_url)
-                            publication_data['contacts'] = contacts
+                        self._attach_contacts(publication_data, html_url, contacts_json)
                         publications.append(publication_data)
             
             # Method 3: Try to parse as flat data structure (based on web search results)
             if not publications:
                 publication_data = self._parse_flat_structure(xml_content)
                 if publication_data:
-                    # Parse contacts from HTML page if URL provided
-                    if html_url:
-                        contacts = self._parse_contacts_from_html_page(html_url)
-                        publication_data['contacts'] = contacts
+                    self._attach_contacts(publication_data, html_url, contacts_json)
                     publications.append(publication_data)
             
             return publications
@@ -95,6 +132,13 @@ class SHABParser:
             print(f"Error parsing XML: {e}")
             return []
     
+    def _attach_contacts(self, publication_data: Dict[str, Any], html_url: Optional[str], contacts_json: Optional[str]) -> None:
+        """Set contacts from pre-fetched JSON, or fetch them from the HTML URL if provided."""
+        if contacts_json is not None:
+            publication_data['contacts'] = self._extract_contacts_from_json(contacts_json)
+        elif html_url:
+            publication_data['contacts'] = self._parse_contacts_from_html_page(html_url)
+    
     def _parse_publication(self, pub_elem: etree.Element) -> Optional[Dict[str, Any]]:
         """Parse a single publication element."""
         try:
@@ -144,18 +188,12 @@ class SHABParser:
     def _parse_multilingual_title(self, pub_elem: etree.Element) -> Optional[Dict[str, str]]:
         """Parse multilingual title information."""
         try:
-            title_elem = pub_elem.xpath('.//title', namespaces=self.namespaces)
-            if not title_elem:
-                return None
-            
-            title_elem = title_elem[0]
-            
-            # Extract all language versions
+            # Extract all language versions in one traversal
             title_data = {}
-            for lang in ['de', 'en', 'it', 'fr']:
-                lang_text = self._get_text(title_elem.xpath(f'.//{lang}/text()', namespaces=self.namespaces))
+            for lang_elem in _XP_TITLE_LANGUAGES(pub_elem):
+                lang_text = self._get_text([lang_elem.text])
                 if lang_text:
-                    title_data[lang] = lang_text
+                    title_data.setdefault(lang_elem.tag, lang_text)
             
             return title_data if title_data else None
             
@@ -166,12 +204,10 @@ class SHABParser:
     def _parse_registration_office(self, pub_elem: etree.Element) -> Optional[Dict[str, Any]]:
         """Parse registration office information with full details."""
         try:
-            office_elem = pub_elem.xpath('.//registrationOffice', namespaces=self.namespaces)
-            if not office_elem:
+            office_elem = next(pub_elem.iter('registrationOffice'), None)
+            if office_elem is None:
                 return None
             
-            office_elem = office_elem[0]
-            
             office_data = {
                 'id': self._get_text(office_elem.xpath('.//id/text()', namespaces=self.namespaces)),
                 'display_name': self._get_text(office_elem.xpath('.//displayName/text()', namespaces=self.namespaces)),
@@ -183,9 +219,8 @@ class SHABParser:
             }
             
             # Add post office box details if available
-            post_office_box = office_elem.xpath('.//postOfficeBox', namespaces=self.namespaces)
-            if post_office_box:
-                post_office_box = post_office_box[0]
+            post_office_box = next(office_elem.iter('postOfficeBox'), None)
+            if post_office_box is not None:
                 office_data['post_office_box'] = {
                     'number': self._get_text(post_office_box.xpath('.//number/text()', namespaces=self.namespaces)),
                     'zip_code': self._get_text(post_office_box.xpath('.//zipCode/text()', namespaces=self.namespaces)),
@@ -203,10 +238,10 @@ class SHABParser:
         objects = []
         
         # Parse auctionObjects as simple string elements
-        for obj_elem in pub_elem.xpath('.//auctionObjects', namespaces=self.namespaces):
+        for obj_elem in pub_elem.iter('auctionObjects'):
             try:
-                # Extract text content from the element
-                text_content = self._get_text(obj_elem.xpath('.//text()', namespaces=self.namespaces))
+                # Join the text of every paragraph, collapsing the XML indentation
+                text_content = _WHITESPACE.sub(' ', ' '.join(obj_elem.itertext())).strip()
                 if text_content:
                     obj_data = {
                         'description': text_content,
@@ -372,12 +407,10 @@ class SHABParser:
     def _parse_circulation(self, pub_elem: etree.Element) -> Optional[Dict[str, Any]]:
         """Parse circulation information."""
         try:
-            circulation_elem = pub_elem.xpath('.//circulation', namespaces=self.namespaces)
-            if not circulation_elem:
+            circulation_elem = next(pub_elem.iter('circulation'), None)
+            if circulation_elem is None:
                 return None
             
-            circulation_elem = circulation_elem[0]
-            
             return {
                 'entry_deadline': self._parse_date(circulation_elem.xpath('.//entryDeadline/text()', namespaces=self.namespaces)),
                 'comment_entry_deadline': self._get_text(circulation_elem.xpath('.//commentEntryDeadline/text()', namespaces=self.namespaces))
@@ -390,12 +423,10 @@ class SHABParser:
     def _parse_registration(self, pub_elem: etree.Element) -> Optional[Dict[str, Any]]:
         """Parse registration information."""
         try:
-            registration_elem = pub_elem.xpath('.//registration', namespaces=self.namespaces)
-            if not registration_elem:
+            registration_elem = next(pub_elem.iter('registration'), None)
+            if registration_elem is None:
                 return None
             
-            registration_elem = registration_elem[0]
-            
             return {
                 'entry_deadline': self._parse_date(registration_elem.xpath('.//entryDeadline/text()', namespaces=self.namespaces)),
                 'comment_entry_deadline': self._get_text(registration_elem.xpath('.//commentEntryDeadline/text()', namespaces=self.namespaces))
@@ -409,11 +440,11 @@ class SHABParser:
         """Parse debtor information with complete company and person details."""
         debtors = []
         
-        for debtor_elem in pub_elem.xpath('.//debtor', namespaces=self.namespaces):
+        for debtor_elem in pub_elem.iter('debtor'):
             try:
                 # Get the first selectType (debtor type), not the residence selectType
-                debtor_type_elements = debtor_elem.xpath('.//selectType', namespaces=self.namespaces)
-                debtor_type = self._get_text(debtor_type_elements[0].xpath('.//text()', namespaces=self.namespaces)) if debtor_type_elements else None
+                debtor_type_elem = next(debtor_elem.iter('selectType'), None)
+                debtor_type = self._get_text(list(debtor_type_elem.itertext())) if debtor_type_elem is not None else None
                 
                 if debtor_type == 'company':
                     debtor_data = self._parse_company_debtor(debtor_elem)
@@ -436,34 +467,31 @@ class SHABParser:
     def _parse_company_debtor(self, debtor_elem: etree.Element) -> Optional[Dict[str, Any]]:
         """Parse company debtor with complete details."""
         try:
-            company_elem = debtor_elem.xpath('.//company', namespaces=self.namespaces)
-            if not company_elem:
+            company_elem = debtor_elem.find('company')
+            if company_elem is None:
                 return None
                 
-            company_elem = company_elem[0]
-            
             # Parse address if present
             address_data = None
-            address_elem = company_elem.xpath('.//address', namespaces=self.namespaces)
-            if address_elem:
-                address_elem = address_elem[0]
+            address_elem = company_elem.find('address')
+            if address_elem is not None:
                 address_data = {
-                    'address_line1': self._get_text(address_elem.xpath('.//addressLine1/text()', namespaces=self.namespaces)),
-                    'street': self._get_text(address_elem.xpath('.//street/text()', namespaces=self.namespaces)),
-                    'house_number': self._get_text(address_elem.xpath('.//houseNumber/text()', namespaces=self.namespaces)),
-                    'swiss_zip_code': self._get_text(address_elem.xpath('.//swissZipCode/text()', namespaces=self.namespaces)),
-                    'town': self._get_text(address_elem.xpath('.//town/text()', namespaces=self.namespaces))
+                    'address_line1': self._find_text(address_elem, 'addressLine1'),
+                    'street': self._find_text(address_elem, 'street'),
+                    'house_number': self._find_text(address_elem, 'houseNumber'),
+                    'swiss_zip_code': self._find_text(address_elem, 'swissZipCode'),
+                    'town': self._find_text(address_elem, 'town')
                 }
             
             return {
                 'id': str(uuid.uuid4()),
                 'debtor_type': 'company',
-                'name': self._get_text(company_elem.xpath('.//name/text()', namespaces=self.namespaces)),
-                'uid': self._get_text(company_elem.xpath('.//uid/text()', namespaces=self.namespaces)),
-                'uid_organisation_id': self._get_text(company_elem.xpath('.//uidOrganisationId/text()', namespaces=self.namespaces)),
-                'uid_organisation_id_categorie': self._get_text(company_elem.xpath('.//uidOrganisationIdCategorie/text()', namespaces=self.namespaces)),
-                'legal_form': self._get_text(company_elem.xpath('.//legalForm/text()', namespaces=self.namespaces)),
-                'canton': self._get_text(company_elem.xpath('.//canton/text()', namespaces=self.namespaces)),
+                'name': self._find_text(company_elem, 'name'),
+                'uid': self._find_text(company_elem, 'uid'),
+                'uid_organisation_id': self._find_text(company_elem, 'uidOrganisationId'),
+                'uid_organisation_id_categorie': self._find_text(company_elem, 'uidOrganisationIdCategorie'),
+                'legal_form': self._find_text(company_elem, 'legalForm'),
+                'canton': self._find_text(company_elem, 'canton'),
                 'address': address_data,
                 # Legacy fields for compatibility
                 'prename': None,
@@ -478,54 +506,49 @@ class SHABParser:
     def _parse_person_debtor(self, debtor_elem: etree.Element) -> Optional[Dict[str, Any]]:
         """Parse person debtor with complete details."""
         try:
-            person_elem = debtor_elem.xpath('.//person', namespaces=self.namespaces)
-            if not person_elem:
+            person_elem = debtor_elem.find('person')
+            if person_elem is None:
                 return None
                 
-            person_elem = person_elem[0]
-            
             # Parse country of origin
             country_data = None
-            country_elem = person_elem.xpath('.//countryOfOrigin', namespaces=self.namespaces)
-            if country_elem:
-                country_elem = country_elem[0]
+            country_elem = person_elem.find('countryOfOrigin')
+            if country_elem is not None:
                 country_data = {
                     'name': {
-                        'de': self._get_text(country_elem.xpath('.//name/de/text()', namespaces=self.namespaces)),
-                        'fr': self._get_text(country_elem.xpath('.//name/fr/text()', namespaces=self.namespaces)),
-                        'it': self._get_text(country_elem.xpath('.//name/it/text()', namespaces=self.namespaces)),
-                        'en': self._get_text(country_elem.xpath('.//name/en/text()', namespaces=self.namespaces))
+                        'de': self._find_text(country_elem, 'name/de'),
+                        'fr': self._find_text(country_elem, 'name/fr'),
+                        'it': self._find_text(country_elem, 'name/it'),
+                        'en': self._find_text(country_elem, 'name/en')
                     },
-                    'iso_code': self._get_text(country_elem.xpath('.//isoCode/text()', namespaces=self.namespaces))
+                    'iso_code': self._find_text(country_elem, 'isoCode')
                 }
             
             # Parse residence
             residence_data = None
-            residence_elem = person_elem.xpath('.//residence', namespaces=self.namespaces)
-            if residence_elem:
-                residence_elem = residence_elem[0]
+            residence_elem = person_elem.find('residence')
+            if residence_elem is not None:
                 residence_data = {
-                    'select_type': self._get_text(residence_elem.xpath('.//selectType/text()', namespaces=self.namespaces))
+                    'select_type': self._find_text(residence_elem, 'selectType')
                 }
             
             # Parse Swiss address
             address_data = None
-            address_elem = person_elem.xpath('.//addressSwitzerland', namespaces=self.namespaces)
-            if address_elem:
-                address_elem = address_elem[0]
+            address_elem = person_elem.find('addressSwitzerland')
+            if address_elem is not None:
                 address_data = {
-                    'street': self._get_text(address_elem.xpath('.//street/text()', namespaces=self.namespaces)),
-                    'house_number': self._get_text(address_elem.xpath('.//houseNumber/text()', namespaces=self.namespaces)),
-                    'swiss_zip_code': self._get_text(address_elem.xpath('.//swissZipCode/text()', namespaces=self.namespaces)),
-                    'town': self._get_text(address_elem.xpath('.//town/text()', namespaces=self.namespaces))
+                    'street': self._find_text(address_elem, 'street'),
+                    'house_number': self._find_text(address_elem, 'houseNumber'),
+                    'swiss_zip_code': self._find_text(address_elem, 'swissZipCode'),
+                    'town': self._find_text(address_elem, 'town')
                 }
             
             return {
                 'id': str(uuid.uuid4()),
                 'debtor_type': 'person',
-                'name': self._get_text(person_elem.xpath('.//name/text()', namespaces=self.namespaces)),
-                'prename': self._get_text(person_elem.xpath('.//prename/text()', namespaces=self.namespaces)),
-                'date_of_birth': self._parse_date(person_elem.xpath('.//dateOfBirth/text()', namespaces=self.namespaces)),
+                'name': self._find_text(person_elem, 'name'),
+                'prename': self._find_text(person_elem, 'prename'),
+                'date_of_birth': self._parse_date([person_elem.findtext('dateOfBirth')]),
                 'country_of_origin': country_data,
                 'residence': residence_data,
                 'address_switzerland': address_data,
@@ -589,25 +612,29 @@ class SHABParser:
         
         return contacts
     
+    def get_contacts_json_url(self, html_url: str) -> Optional[str]:
+        """Map a publication XML or HTML URL to the JSON API URL holding its contacts."""
+        # Example: https://www.shab.ch/api/v1/publications/xxx/xml -> https://www.shab.ch/api/v1/publications/xxx
+        if '/xml' in html_url:
+            return html_url.replace('/xml', '')
+        
+        # Extract the publication ID from the URL
+        # Handle both formats: /publications/xxx and /publications/detail/xxx
+        match = re.search(r'/publications/(?:detail/)?([^/]+)', html_url)
+        if match:
+            pub_id = match.group(1)
+            return f"https://www.shab.ch/api/v1/publications/{pub_id}"
+        return None
+    
     def _parse_contacts_from_html_page(self, html_url: str) -> List[Dict[str, Any]]:
         """Parse contact information from the JSON API endpoint."""
         contacts = []
         
         try:
-            # Convert XML URL to JSON API URL
-            # Example: https://www.shab.ch/api/v1/publications/xxx/xml -> https://www.shab.ch/api/v1/publications/xxx
-            if '/xml' in html_url:
-                json_url = html_url.replace('/xml', '')
-            else:
-                # Extract the publication ID from the URL
-                import re
-                # Handle both formats: /publications/xxx and /publications/detail/xxx
-                match = re.search(r'/publications/(?:detail/)?([^/]+)', html_url)
-                if match:
-                    pub_id = match.group(1)
-                    json_url = f"https://www.shab.ch/api/v1/publications/{pub_id}"
-                else:
-                    return contacts
+            # Convert XML/HTML URL to JSON API URL
+            json_url = self.get_contacts_json_url(html_url)
+            if not json_url:
+                return contacts
             
             # Fetch JSON content
             json_content = self.fetch_url_data(json_url)
@@ -625,9 +652,7 @@ class SHABParser:
         contacts = []
         
         try:
-            import json
-            
-            data = json.loads(json_content)
+            data = json_loads(json_content)
             
             # Extract registration office information as contact
             if 'meta' in data and 'registrationOffice' in data['meta']:
@@ -667,8 +692,6 @@ class SHABParser:
         contacts = []
         
         try:
-            import re
-            
             # Pattern to match contact information
             # Example: "Point of contact\nOffice des poursuites des districts de Sion, Hérens et Conthey\nRue de la Piscine 10\n1950 Sion"
             contact_pattern = r'Point of contact\s*\n([^\n]+)\s*\n([^\n]+)\s*\n(\d{4}\s+[^\n]+)'
@@ -721,12 +744,23 @@ class SHABParser:
                 return text.strip()
         return default
     
+    def _find_text(self, elem: etree.Element, path: str, default: str = None) -> Optional[str]:
+        """Get the stripped text of the first element matching a child path."""
+        return self._get_text([elem.findtext(path)], default)
+    
     def _parse_date(self, date_list: List[str]) -> Optional[date]:
         """Parse date from string list."""
         date_str = self._get_text(date_list)
         if not date_str:
             return None
         
+        # SHAB dates are almost always ISO; fromisoformat skips strptime's format parsing
+        if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+            try:
+                return date.fromisoformat(date_str)
+            except ValueError:
+                return None
+        
         try:
             # Try different date formats
             formats = ['%Y-%m-%d', '%d.%m.%Y', '%Y%m%d']
@@ -766,8 +800,6 @@ class SHABParser:
             # Let's try to extract information using regex patterns
             
             # Extract basic information using regex
-            import re
-            
             # Extract ID
             id_match = re.search(r'([a-f0-9-]{36})', xml_content)
             publication_id = id_match.group(1) if id_match else str(uuid.uuid4())
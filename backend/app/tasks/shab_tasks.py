@@ -2,9 +2,10 @@
 
 import uuid
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from celery import current_task
 
 from app.celery_app import celery_app
@@ -74,125 +75,120 @@ def fetch_shab_data(self, days_back: int = 7):
         raise
 
 
-async def _process_publication_data(pub_data: Dict[str, Any]):
-    """Process a single publication's data and save to database."""
+def _build_publication_rows(pub_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map a parsed publication to column values for each table it populates."""
+    
+    rows = {
+        'publications': [],
+        'auctions': [],
+        'auction_objects': [],
+        'debtors': [],
+        'contacts': []
+    }
+    
+    rows['publications'].append({
+        'id': pub_data['id'],
+        'publication_date': pub_data['publication_date'],
+        'expiration_date': pub_data.get('expiration_date'),
+        'title': pub_data['title'],  # Now JSONB for multilingual titles
+        'language': pub_data['language'],
+        'canton': pub_data['canton'],
+        'content': pub_data.get('content')
+    })
+    
+    for auction_data in pub_data.get('auctions', []):
+        rows['auctions'].append({
+            'id': auction_data['id'],
+            'date': auction_data['date'],
+            'time': auction_data.get('time'),
+            'location': auction_data['location'],
+            'circulation_entry_deadline': auction_data.get('circulation', {}).get('entry_deadline'),
+            'circulation_comment_deadline': auction_data.get('circulation', {}).get('comment_entry_deadline'),
+            'registration_entry_deadline': auction_data.get('registration', {}).get('entry_deadline'),
+            'registration_comment_deadline': auction_data.get('registration', {}).get('comment_entry_deadline'),
+            'publication_id': pub_data['id']
+        })
+        
+        for obj_data in auction_data.get('auction_objects', []):
+            rows['auction_objects'].append({
+                'id': obj_data.get('id', str(uuid.uuid4())),
+                'parcel_number': obj_data.get('parcel_number'),
+                'property_number': obj_data.get('property_number'),
+                'surface_area': obj_data.get('surface_area'),
+                'estimated_value': obj_data.get('estimated_value'),
+                'description': obj_data.get('description'),
+                'property_type': obj_data.get('property_type'),
+                'address': obj_data.get('address'),
+                'municipality': obj_data.get('municipality'),
+                'canton': obj_data.get('canton'),
+                'remarks': obj_data.get('remarks'),
+                'latitude': obj_data.get('latitude'),
+                'longitude': obj_data.get('longitude'),
+                'auction_id': auction_data['id']
+            })
+    
+    for debtor_data in pub_data.get('debtors', []):
+        # Handle address - convert dict to string if needed
+        address = debtor_data.get('address')
+        if isinstance(address, dict):
+            # Convert address dict to string
+            address_parts = []
+            if address.get('street'):
+                address_parts.append(address['street'])
+            if address.get('house_number'):
+                address_parts.append(address['house_number'])
+            address = ' '.join(address_parts) if address_parts else None
+        
+        rows['debtors'].append({
+            'id': debtor_data['id'],
+            'debtor_type': DebtorType(debtor_data.get('debtor_type', 'person')),
+            'name': debtor_data['name'],
+            'prename': debtor_data.get('prename'),
+            'date_of_birth': debtor_data.get('date_of_birth'),
+            'country_of_origin': debtor_data.get('country_of_origin'),
+            'residence_type': debtor_data.get('residence', {}).get('select_type'),
+            'address': address,
+            'city': debtor_data.get('city'),
+            'postal_code': debtor_data.get('postal_code'),
+            'legal_form': debtor_data.get('legal_form'),
+            'publication_id': pub_data['id']
+        })
+    
+    for contact_data in pub_data.get('contacts', []):
+        rows['contacts'].append({
+            'id': contact_data['id'],
+            'name': contact_data['name'],
+            'phone': contact_data.get('phone'),
+            'email': contact_data.get('email'),
+            'address': contact_data.get('address'),
+            'city': contact_data.get('city'),
+            'postal_code': contact_data.get('postal_code'),
+            'contact_type': contact_data.get('contact_type'),
+            'office_id': contact_data.get('office_id'),
+            'contains_post_office_box': contact_data.get('contains_post_office_box'),
+            'post_office_box': contact_data.get('post_office_box'),
+            'publication_id': pub_data['id']
+        })
+    
+    return rows
+
+
+async def _process_publication_data(pub_data: Dict[str, Any], db: Optional[AsyncSession] = None):
+    """Process a single publication's data and save to database.
+    
+    When ``db`` is given the rows are written inside a SAVEPOINT on that session
+    and committing is left to the caller, so a batch can share one session
+    and one bad record does not roll back the others.
+    """
+    
+    if db is not None:
+        async with db.begin_nested():
+            await _store_publication(db, pub_data)
+        return
     
     async with AsyncSessionLocal() as db:
         try:
-            # Check if publication already exists
-            existing_pub = await db.execute(
-                select(Publication).where(
-                    and_(
-                        Publication.title == pub_data['title'],
-                        Publication.publication_date == pub_data['publication_date']
-                    )
-                )
-            )
-            
-            if existing_pub.scalar_one_or_none():
-                return  # Skip if already exists
-            
-            # Create publication
-            publication = Publication(
-                id=pub_data['id'],
-                publication_date=pub_data['publication_date'],
-                expiration_date=pub_data.get('expiration_date'),
-                title=pub_data['title'],  # Now JSONB for multilingual titles
-                language=pub_data['language'],
-                canton=pub_data['canton'],
-                content=pub_data.get('content')
-            )
-            
-            db.add(publication)
-            await db.flush()  # Get the ID
-            
-            # Create auctions
-            for auction_data in pub_data.get('auctions', []):
-                auction = Auction(
-                    id=auction_data['id'],
-                    date=auction_data['date'],
-                    time=auction_data.get('time'),
-                    location=auction_data['location'],
-                    circulation_entry_deadline=auction_data.get('circulation', {}).get('entry_deadline'),
-                    circulation_comment_deadline=auction_data.get('circulation', {}).get('comment_entry_deadline'),
-                    registration_entry_deadline=auction_data.get('registration', {}).get('entry_deadline'),
-                    registration_comment_deadline=auction_data.get('registration', {}).get('comment_entry_deadline'),
-                    publication_id=publication.id
-                )
-                
-                db.add(auction)
-                await db.flush()
-                
-                # Create auction objects
-                for obj_data in auction_data.get('auction_objects', []):
-                    auction_object = AuctionObject(
-                        id=obj_data.get('id', str(uuid.uuid4())),
-                        parcel_number=obj_data.get('parcel_number'),
-                        property_number=obj_data.get('property_number'),
-                        surface_area=obj_data.get('surface_area'),
-                        estimated_value=obj_data.get('estimated_value'),
-                        description=obj_data.get('description'),
-                        property_type=obj_data.get('property_type'),
-                        address=obj_data.get('address'),
-                        municipality=obj_data.get('municipality'),
-                        canton=obj_data.get('canton'),
-                        remarks=obj_data.get('remarks'),
-                        latitude=obj_data.get('latitude'),
-                        longitude=obj_data.get('longitude'),
-                        auction_id=auction.id
-                    )
-                    
-                    db.add(auction_object)
-            
-            # Create debtors
-            for debtor_data in pub_data.get('debtors', []):
-                # Handle address - convert dict to string if needed
-                address = debtor_data.get('address')
-                if isinstance(address, dict):
-                    # Convert address dict to string
-                    address_parts = []
-                    if address.get('street'):
-                        address_parts.append(address['street'])
-                    if address.get('house_number'):
-                        address_parts.append(address['house_number'])
-                    address = ' '.join(address_parts) if address_parts else None
-                
-                debtor = Debtor(
-                    id=debtor_data['id'],
-                    debtor_type=DebtorType(debtor_data.get('debtor_type', 'person')),
-                    name=debtor_data['name'],
-                    prename=debtor_data.get('prename'),
-                    date_of_birth=debtor_data.get('date_of_birth'),
-                    country_of_origin=debtor_data.get('country_of_origin'),
-                    residence_type=debtor_data.get('residence', {}).get('select_type'),
-                    address=address,
-                    city=debtor_data.get('city'),
-                    postal_code=debtor_data.get('postal_code'),
-                    legal_form=debtor_data.get('legal_form'),
-                    publication_id=publication.id
-                )
-                
-                db.add(debtor)
-            
-            # Create contacts
-            for contact_data in pub_data.get('contacts', []):
-                contact = Contact(
-                    id=contact_data['id'],
-                    name=contact_data['name'],
-                    phone=contact_data.get('phone'),
-                    email=contact_data.get('email'),
-                    address=contact_data.get('address'),
-                    city=contact_data.get('city'),
-                    postal_code=contact_data.get('postal_code'),
-                    contact_type=contact_data.get('contact_type'),
-                    office_id=contact_data.get('office_id'),
-                    contains_post_office_box=contact_data.get('contains_post_office_box'),
-                    post_office_box=contact_data.get('post_office_box'),
-                    publication_id=publication.id
-                )
-                
-                db.add(contact)
-            
+            await _store_publication(db, pub_data)
             await db.commit()
             
         except Exception as e:
@@ -200,6 +196,34 @@ async def _process_publication_data(pub_data: Dict[str, Any]):
             raise e
 
 
+async def _store_publication(db: AsyncSession, pub_data: Dict[str, Any]):
+    """Add a publication and its related rows to the session, unless it already exists."""
+    
+    rows = _build_publication_rows(pub_data)
+    
+    # Create publication; the existence check is the same statement
+    inserted = await db.execute(
+        pg_insert(Publication)
+        .values(**rows['publications'][0])
+        .on_conflict_do_nothing(index_elements=['id'])
+        .returning(Publication.id)
+    )
+    
+    if inserted.scalar_one_or_none() is None:
+        return  # Skip if already exists
+    
+    # Create auctions, then their objects
+    db.add_all([Auction(**row) for row in rows['auctions']])
+    await db.flush()
+    db.add_all([AuctionObject(**row) for row in rows['auction_objects']])
+    
+    # Create debtors and contacts
+    db.add_all([Debtor(**row) for row in rows['debtors']])
+    db.add_all([Contact(**row) for row in rows['contacts']])
+    
+    await db.flush()
+
+
 @celery_app.task
 def cleanup_expired_data():
     """Clean up expired auction data (auctions older than 1 year)."""
@@ -212,36 +236,50 @@ def cleanup_expired_data():
         raise
 
 
-async def _cleanup_expired_data():
-    """Clean up expired data."""
+async def _cleanup_expired_data(db: Optional[AsyncSession] = None):
+    """Clean up expired data.
     
-    cutoff_date = date.today() - timedelta(days=365)
+    When ``db`` is given the deletes are only flushed; committing is left to the caller.
+    """
+    
+    if db is not None:
+        return await _delete_expired_auctions(db)
     
     async with AsyncSessionLocal() as db:
         try:
-            # Find expired auctions
-            expired_auctions = await db.execute(
-                select(Auction).where(Auction.date < cutoff_date)
-            )
-            auctions_to_delete = expired_auctions.scalars().all()
-            
-            # Delete expired auctions (cascade will handle related objects)
-            for auction in auctions_to_delete:
-                await db.delete(auction)
-            
+            result = await _delete_expired_auctions(db)
             await db.commit()
-            
-            return {
-                'status': 'completed',
-                'deleted_auctions': len(auctions_to_delete),
-                'cutoff_date': cutoff_date.isoformat()
-            }
+            return result
             
         except Exception as e:
             await db.rollback()
             raise e
 
 
+async def _delete_expired_auctions(db: AsyncSession):
+    """Delete auctions older than one year on the given session."""
+    
+    cutoff_date = date.today() - timedelta(days=365)
+    
+    # Find expired auctions
+    expired_auctions = await db.execute(
+        select(Auction).where(Auction.date < cutoff_date)
+    )
+    auctions_to_delete = expired_auctions.scalars().all()
+    
+    # Delete expired auctions (cascade will handle related objects)
+    for auction in auctions_to_delete:
+        await db.delete(auction)
+    
+    await db.flush()
+    
+    return {
+        'status': 'completed',
+        'deleted_auctions': len(auctions_to_delete),
+        'cutoff_date': cutoff_date.isoformat()
+    }
+
+
 @celery_app.task
 def geocode_auction_locations():
     """Geocode auction locations for map integration."""
@@ -254,49 +292,63 @@ def geocode_auction_locations():
         raise
 
 
-async def _geocode_auction_locations():
-    """Geocode auction locations that don't have coordinates."""
+async def _geocode_auction_locations(db: Optional[AsyncSession] = None):
+    """Geocode auction locations that don't have coordinates.
+    
+    When ``db`` is given the updates are only flushed; committing is left to the caller.
+    """
+    
+    if db is not None:
+        return await _geocode_missing_coordinates(db)
     
     async with AsyncSessionLocal() as db:
         try:
-            # Find auction objects without coordinates
-            query = select(AuctionObject).where(
-                and_(
-                    AuctionObject.latitude.is_(None),
-                    AuctionObject.longitude.is_(None),
-                    AuctionObject.address.isnot(None)
-                )
-            ).limit(100)  # Process in batches
-            
-            result = await db.execute(query)
-            objects_to_geocode = result.scalars().all()
-            
-            geocoded_count = 0
-            for obj in objects_to_geocode:
-                try:
-                    # Simple geocoding - in production, use a proper geocoding service
-                    coordinates = await _geocode_address(obj.address, obj.municipality, obj.canton)
-                    if coordinates:
-                        obj.latitude = coordinates['lat']
-                        obj.longitude = coordinates['lng']
-                        geocoded_count += 1
-                except Exception as e:
-                    print(f"Error geocoding {obj.address}: {e}")
-                    continue
-            
+            result = await _geocode_missing_coordinates(db)
             await db.commit()
-            
-            return {
-                'status': 'completed',
-                'geocoded_objects': geocoded_count,
-                'total_processed': len(objects_to_geocode)
-            }
+            return result
             
         except Exception as e:
             await db.rollback()
             raise e
 
 
+async def _geocode_missing_coordinates(db: AsyncSession):
+    """Fill in coordinates for up to 100 auction objects on the given session."""
+    
+    # Find auction objects without coordinates
+    query = select(AuctionObject).where(
+        and_(
+            AuctionObject.latitude.is_(None),
+            AuctionObject.longitude.is_(None),
+            AuctionObject.address.isnot(None)
+        )
+    ).limit(100)  # Process in batches
+    
+    result = await db.execute(query)
+    objects_to_geocode = result.scalars().all()
+    
+    geocoded_count = 0
+    for obj in objects_to_geocode:
+        try:
+            # Simple geocoding - in production, use a proper geocoding service
+            coordinates = await _geocode_address(obj.address, obj.municipality, obj.canton)
+            if coordinates:
+                obj.latitude = coordinates['lat']
+                obj.longitude = coordinates['lng']
+                geocoded_count += 1
+        except Exception as e:
+            print(f"Error geocoding {obj.address}: {e}")
+            continue
+    
+    await db.flush()
+    
+    return {
+        'status': 'completed',
+        'geocoded_objects': geocoded_count,
+        'total_processed': len(objects_to_geocode)
+    }
+
+
 async def _geocode_address(address: str, municipality: str, canton: str) -> dict:
     """Geocode an address (placeholder implementation)."""
     
@@ -321,60 +373,65 @@ def generate_daily_report():
         raise
 
 
-async def _generate_daily_report():
-    """Generate daily report."""
+async def _generate_daily_report(db: Optional[AsyncSession] = None):
+    """Generate daily report (on ``db`` when given, otherwise on a new session)."""
+    
+    if db is not None:
+        return await _build_daily_report(db)
     
     async with AsyncSessionLocal() as db:
-        try:
-            today = date.today()
-            yesterday = today - timedelta(days=1)
-            
-            # Count new publications
-            new_pubs = await db.execute(
-                select(Publication).where(
-                    and_(
-                        Publication.publication_date >= yesterday,
-                        Publication.publication_date < today
-                    )
-                )
+        return await _build_daily_report(db)
+
+
+async def _build_daily_report(db: AsyncSession):
+    """Count new and upcoming publications and auctions on the given session."""
+    
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    
+    # Count new publications
+    new_pubs = await db.execute(
+        select(Publication).where(
+            and_(
+                Publication.publication_date >= yesterday,
+                Publication.publication_date < today
             )
-            new_publications_count = len(new_pubs.scalars().all())
-            
-            # Count new auctions
-            new_auctions = await db.execute(
-                select(Auction).where(
-                    and_(
-                        Auction.date >= yesterday,
-                        Auction.date < today
-                    )
-                )
+        )
+    )
+    new_publications_count = len(new_pubs.scalars().all())
+    
+    # Count new auctions
+    new_auctions = await db.execute(
+        select(Auction).where(
+            and_(
+                Auction.date >= yesterday,
+                Auction.date < today
             )
-            new_auctions_count = len(new_auctions.scalars().all())
-            
-            # Count upcoming auctions (next 7 days)
-            upcoming_date = today + timedelta(days=7)
-            upcoming_auctions = await db.execute(
-                select(Auction).where(
-                    and_(
-                        Auction.date >= today,
-                        Auction.date <= upcoming_date
-                    )
-                )
+        )
+    )
+    new_auctions_count = len(new_auctions.scalars().all())
+    
+    # Count upcoming auctions (next 7 days)
+    upcoming_date = today + timedelta(days=7)
+    upcoming_auctions = await db.execute(
+        select(Auction).where(
+            and_(
+                Auction.date >= today,
+                Auction.date <= upcoming_date
             )
-            upcoming_auctions_count = len(upcoming_auctions.scalars().all())
-            
-            report = {
-                'date': today.isoformat(),
-                'new_publications': new_publications_count,
-                'new_auctions': new_auctions_count,
-                'upcoming_auctions': upcoming_auctions_count,
-                'status': 'completed'
-            }
-            
-            # Here you could save the report to a file or send it via email
-            print(f"Daily report generated: {report}")
-            
-            return report
-            
-        except Exception as e:
-            raise e
+        )
+    )
+    upcoming_auctions_count = len(upcoming_auctions.scalars().all())
+    
+    report = {
+        'date': today.isoformat(),
+        'new_publications': new_publications_count,
+        'new_auctions': new_auctions_count,
+        'upcoming_auctions': upcoming_auctions_count,
+        'status': 'completed'
+    }
+    
+    # Here you could save the report to a file or send it via email
+    print(f"Daily report generated: {report}")
+    
+    return report
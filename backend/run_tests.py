@@ -53,7 +53,7 @@ def main():
     
     # 1. Install test dependencies
     results.append(run_command(
-        "pip install pytest pytest-asyncio aiosqlite",
+        "pip install pytest pytest-asyncio pytest-xdist freezegun aiosqlite",
         "Installing test dependencies"
     ))
     
@@ -3,24 +3,27 @@
 Enhanced database bootstrap script that can handle different publication types.
 """
 
+import argparse
 import asyncio
+import json
 import sys
 import os
+import re
 import uuid
-from datetime import datetime
-from typing import List, Dict, Any
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING, List, Dict, Any
 import logging
 
+if TYPE_CHECKING:
+    from lxml import etree
+
 # Add the parent directory to the path so we can import from app
+# (app, SQLAlchemy, lxml and the parser are imported where used, so --help stays fast)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import AsyncSessionLocal
-from app.parsers.shab_parser import SHABParser
-from app.tasks.shab_tasks import _process_publication_data
-from app.models import Publication
-from sqlalchemy import select
-import httpx
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,182 +31,322 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Namespace of the root element names the publication type (SB01, HR01, HR02, ...)
+_EXPORT_NAMESPACE_RE = re.compile(r'/([A-Z]+\d+)-export$')
+
+# Columns loaded with COPY for the widest tables (--copy mode)
+PUBLICATION_COPY_COLUMNS = [
+    'id', 'publication_date', 'expiration_date', 'title', 'language',
+    'canton', 'content', 'created_at', 'updated_at'
+]
+AUCTION_OBJECT_COPY_COLUMNS = [
+    'id', 'parcel_number', 'property_number', 'surface_area', 'estimated_value',
+    'currency', 'description', 'property_type', 'address', 'municipality',
+    'canton', 'latitude', 'longitude', 'remarks', 'auction_id',
+    'created_at', 'updated_at'
+]
+
+
+@dataclass(slots=True, frozen=True)
+class PubURL:
+    """A cleaned publication ID with its XML and HTML URLs."""
+    id: str
+    xml: str
+    html: str
+
+
+def _to_decimal(value: Any) -> Any:
+    """Coerce numeric values to Decimal for asyncpg's binary COPY encoder."""
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
 
 class EnhancedDatabaseBootstrap:
     """Enhanced bootstrap that handles different publication types."""
     
-    def __init__(self):
+    def __init__(self, use_copy: bool = False):
+        from app.parsers.shab_parser import SHABParser
+        
         self.parser = SHABParser()
-        self.processed_count = 0
-        self.error_count = 0
-        self.skipped_count = 0
-        self.non_auction_count = 0
+        self.use_copy = use_copy
+        # Result statuses (processed/skipped/non_auction/error), tallied once per batch
+        self._stats = Counter()
     
-    def detect_publication_type(self, xml_content: str) -> str:
-        """Detect the publication type from XML content."""
-        if 'SB01' in xml_content:
-            return 'SB01'  # Auction/Debt Collection
-        elif 'HR02' in xml_content:
-            return 'HR02'  # Commercial Register
-        elif 'HR01' in xml_content:
-            return 'HR01'  # Commercial Register (different version)
-        else:
-            return 'UNKNOWN'
+    def detect_publication_type(self, root: "etree._Element") -> str:
+        """Detect the publication type from the root element's export namespace."""
+        from lxml import etree
+        
+        # e.g. <SB01:publication xmlns:SB01="https://shab.ch/shab/SB01-export">
+        match = _EXPORT_NAMESPACE_RE.search(etree.QName(root).namespace or '')
+        return match.group(1) if match else 'UNKNOWN'
     
-    def construct_urls(self, publication_ids: List[str]) -> List[Dict[str, str]]:
-        """Construct URLs for publication IDs."""
-        urls = []
+    def construct_urls(self, publication_ids: List[str]) -> List[PubURL]:
+        """Construct URLs for publication IDs, counting malformed IDs as errors."""
         xml_base_url = "https://www.shab.ch/api/v1/publications/"
         html_base_url = "https://www.shab.ch/#!/search/publications/detail/"
         
+        # Bound once so the loop skips the per-ID method lookups; same cleaning
+        # as pub_id.strip().lstrip('@')
+        strip, lstrip = str.strip, str.lstrip
+        
+        urls = []
         for pub_id in publication_ids:
-            clean_id = pub_id.strip().lstrip('@')
+            clean_id = lstrip(strip(pub_id), '@')
+            # Publication.id is a UUID column; one bad ID would fail the whole batch lookup
+            try:
+                uuid.UUID(clean_id)
+            except ValueError:
+                logger.error("Invalid publication ID: %r", pub_id)
+                self._stats['error'] += 1
+                continue
             
-            xml_url = f"{xml_base_url}{clean_id}/xml"
-            html_url = f"{html_base_url}{clean_id}"
-            
-            urls.append({
-                'id': clean_id,
-                'xml_url': xml_url,
-                'html_url': html_url
-            })
+            urls.append(PubURL(
+                id=clean_id,
+                xml=f"{xml_base_url}{clean_id}/xml",
+                html=f"{html_base_url}{clean_id}"
+            ))
         
         return urls
     
-    async def check_existing_publication(self, publication_id: str) -> bool:
-        """Check if a publication already exists in the database."""
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(
-                select(Publication).where(Publication.id == publication_id)
-            )
-            return result.scalar_one_or_none() is not None
+    async def find_existing_publications(self, db, publication_ids: List[str]) -> set:
+        """Return the IDs from publication_ids that are already in the database."""
+        from app.models import Publication
+        from sqlalchemy import select
+        
+        result = await db.execute(
+            select(Publication.id).where(Publication.id.in_(publication_ids))
+        )
+        return {str(pub_id) for pub_id in result.scalars()}
     
-    async def fetch_and_analyze_publication(self, url_info: Dict[str, str]) -> Dict[str, Any]:
+    async def fetch_and_analyze_publication(self, url_info: PubURL) -> Dict[str, Any]:
         """Fetch and analyze a publication to determine its type and content."""
         try:
-            logger.info(f"Analyzing publication: {url_info['id']}")
+            logger.info("Analyzing publication: %s", url_info.id)
             
-            # Check if already exists
-            if await self.check_existing_publication(url_info['id']):
-                logger.info(f"Publication {url_info['id']} already exists, skipping")
-                self.skipped_count += 1
-                return None
-            
-            # Fetch XML data
-            logger.info(f"Fetching XML from: {url_info['xml_url']}")
-            xml_content = self.parser.fetch_url_data(url_info['xml_url'])
+            # Fetch XML data off the event loop
+            logger.info("Fetching XML from: %s", url_info.xml)
+            xml_content = await asyncio.to_thread(self.parser.fetch_url_data, url_info.xml)
             
             if not xml_content:
-                logger.error(f"Failed to fetch XML for {url_info['id']}")
-                self.error_count += 1
+                logger.error("Failed to fetch XML for %s", url_info.id)
                 return None
             
-            # Detect publication type
-            pub_type = self.detect_publication_type(xml_content)
-            logger.info(f"Publication type detected: {pub_type}")
+            # Parse once; the root element tells us the publication type
+            root = self.parser.parse_document(xml_content)
+            pub_type = self.detect_publication_type(root)
+            logger.info("Publication type detected: %s", pub_type)
             
             if pub_type != 'SB01':
-                logger.info(f"Skipping non-auction publication {url_info['id']} (type: {pub_type})")
-                self.non_auction_count += 1
+                logger.info("Skipping non-auction publication %s (type: %s)", url_info.id, pub_type)
                 return {
-                    'id': url_info['id'],
+                    'id': url_info.id,
                     'type': pub_type,
                     'skip_reason': f'Non-auction publication (type: {pub_type})'
                 }
             
-            # Parse XML with HTML URL for contact extraction
-            logger.info(f"Parsing auction publication: {url_info['id']}")
-            publications = self.parser.parse_xml(xml_content, url_info['html_url'])
+            # Contacts are only needed for auctions, so fetch them once the type is known
+            contacts_json = None
+            json_url = self.parser.get_contacts_json_url(url_info.html)
+            if json_url:
+                try:
+                    contacts_json = await asyncio.to_thread(self.parser.fetch_url_data, json_url)
+                except Exception as e:
+                    logger.warning("Failed to fetch contacts for %s: %s", url_info.id, e)
+            
+            # Parse XML with the pre-fetched contacts JSON
+            logger.info("Parsing auction publication: %s", url_info.id)
+            publications = self.parser.parse_xml(xml_content, contacts_json=contacts_json, root=root)
             
             if not publications:
-                logger.error(f"No publications found in XML for {url_info['id']}")
-                self.error_count += 1
+                logger.error("No publications found in XML for %s", url_info.id)
                 return None
             
             publication_data = publications[0]
             
             # Ensure the ID matches
-            if publication_data.get('id') != url_info['id']:
-                logger.warning(f"ID mismatch: expected {url_info['id']}, got {publication_data.get('id')}")
-                publication_data['id'] = url_info['id']
+            if publication_data.get('id') != url_info.id:
+                logger.warning("ID mismatch: expected %s, got %s", url_info.id, publication_data.get('id'))
+                publication_data['id'] = url_info.id
             
             # Add publication type info
             publication_data['publication_type'] = pub_type
             
-            logger.info(f"Successfully parsed auction publication: {url_info['id']}")
+            logger.info("Successfully parsed auction publication: %s", url_info.id)
             return publication_data
             
         except Exception as e:
-            logger.error(f"Error analyzing publication {url_info['id']}: {str(e)}")
-            self.error_count += 1
+            logger.error("Error analyzing publication %s: %s", url_info.id, e)
             return None
     
-    async def store_publication_data(self, publication_data: Dict[str, Any]) -> bool:
-        """Store publication data in the database."""
+    async def store_publication_data(self, publication_data: Dict[str, Any], db) -> bool:
+        """Store publication data on the batch session (committed by bootstrap_database)."""
+        from app.tasks.shab_tasks import _process_publication_data
+        
         try:
-            logger.info(f"Storing auction publication: {publication_data['id']}")
+            logger.info("Storing auction publication: %s", publication_data['id'])
             
             # Use the existing task function to process and store data
-            await _process_publication_data(publication_data)
+            await _process_publication_data(publication_data, db)
             
-            logger.info(f"Successfully stored auction publication: {publication_data['id']}")
-            self.processed_count += 1
+            logger.info("Successfully stored auction publication: %s", publication_data['id'])
             return True
             
         except Exception as e:
-            logger.error(f"Error storing publication {publication_data['id']}: {str(e)}")
-            self.error_count += 1
+            logger.error("Error storing publication %s: %s", publication_data['id'], e)
             return False
     
-    async def process_publication(self, url_info: Dict[str, str]) -> Dict[str, Any]:
-        """Process a single publication (analyze, parse if auction, store)."""
+    async def copy_publication_batch(self, db, publications: List[Dict[str, Any]]) -> bool:
+        """Store a batch of publications, using COPY for the widest tables."""
+        from app.models import Auction, Debtor, Contact
+        from app.tasks.shab_tasks import _build_publication_rows
+        from sqlalchemy import insert
+        
+        # COPY has no ON CONFLICT, so a repeated ID would fail the whole batch
+        unique_publications = {}
+        for publication_data in publications:
+            unique_publications.setdefault(str(publication_data['id']), publication_data)
+        
+        rows = {'publications': [], 'auctions': [], 'auction_objects': [], 'debtors': [], 'contacts': []}
+        for publication_data in unique_publications.values():
+            for table, table_rows in _build_publication_rows(publication_data).items():
+                rows[table].extend(table_rows)
+        
+        now = datetime.now(timezone.utc)
+        publication_records = [
+            (
+                uuid.UUID(str(row['id'])), row['publication_date'], row['expiration_date'],
+                json.dumps(row['title']), row['language'], row['canton'], row['content'],
+                now, now
+            )
+            for row in rows['publications']
+        ]
+        auction_object_records = [
+            (
+                uuid.UUID(str(row['id'])), row['parcel_number'], row['property_number'],
+                _to_decimal(row['surface_area']), _to_decimal(row['estimated_value']), 'CHF',
+                row['description'], row['property_type'], row['address'], row['municipality'],
+                row['canton'], _to_decimal(row['latitude']), _to_decimal(row['longitude']),
+                row['remarks'], uuid.UUID(str(row['auction_id'])), now, now
+            )
+            for row in rows['auction_objects']
+        ]
+        
+        try:
+            async with db.begin_nested():
+                # COPY goes through the session's own asyncpg connection, so it
+                # shares the transaction with the ORM inserts below
+                connection = await db.connection()
+                raw_connection = (await connection.get_raw_connection()).driver_connection
+                
+                await raw_connection.copy_records_to_table(
+                    'publications', records=publication_records, columns=PUBLICATION_COPY_COLUMNS
+                )
+                if rows['auctions']:
+                    await db.execute(insert(Auction), rows['auctions'])
+                if auction_object_records:
+                    await raw_connection.copy_records_to_table(
+                        'auction_objects', records=auction_object_records, columns=AUCTION_OBJECT_COPY_COLUMNS
+                    )
+                if rows['debtors']:
+                    await db.execute(insert(Debtor), rows['debtors'])
+                if rows['contacts']:
+                    await db.execute(insert(Contact), rows['contacts'])
+            
+        except Exception as e:
+            logger.error("Error copying batch of %s publications: %s", len(unique_publications), e)
+            return False
+        
+        logger.info("Copied %s auction publications", len(unique_publications))
+        return True
+    
+    async def store_batch(self, db, parsed: List[Dict[str, Any]]) -> None:
+        """Store parsed publications on the batch session and commit once."""
+        if self.use_copy and await self.copy_publication_batch(db, [r['data'] for r in parsed]):
+            for r in parsed:
+                r['status'] = 'processed'
+        else:
+            if self.use_copy:
+                # The COPY savepoint was rolled back (e.g. a row inserted since the
+                # existence check); store one at a time so only the conflicting one fails
+                logger.info("Falling back to per-publication inserts for this batch")
+            
+            # One publication at a time: an AsyncSession must not be used concurrently
+            for r in parsed:
+                stored = await self.store_publication_data(r['data'], db)
+                r['status'] = 'processed' if stored else 'error'
+        
+        try:
+            await db.commit()
+        except Exception as e:
+            logger.error("Error committing batch: %s", e)
+            await db.rollback()
+            for r in parsed:
+                r['status'] = 'error'
+    
+    async def process_publication(self, url_info: PubURL) -> Dict[str, Any]:
+        """Process a single publication (analyze, parse if auction); storing happens per batch."""
         try:
             # Analyze publication
             result = await self.fetch_and_analyze_publication(url_info)
             
             if not result:
-                return {'status': 'error', 'id': url_info['id']}
+                return {'status': 'error', 'id': url_info.id}
             
             # Check if it's a non-auction publication
             if 'skip_reason' in result:
-                return {'status': 'skipped', 'id': url_info['id'], 'reason': result['skip_reason']}
-            
-            # Store auction publication
-            success = await self.store_publication_data(result)
+                return {'status': 'non_auction', 'id': url_info.id, 'reason': result['skip_reason']}
             
-            if success:
-                return {'status': 'processed', 'id': url_info['id']}
-            else:
-                return {'status': 'error', 'id': url_info['id']}
+            return {'status': 'parsed', 'id': url_info.id, 'data': result}
             
         except Exception as e:
-            logger.error(f"Error processing publication {url_info['id']}: {str(e)}")
-            self.error_count += 1
-            return {'status': 'error', 'id': url_info['id']}
+            logger.error("Error processing publication %s: %s", url_info.id, e)
+            return {'status': 'error', 'id': url_info.id}
     
     async def bootstrap_database(self, publication_ids: List[str], batch_size: int = 5) -> Dict[str, int]:
         """Bootstrap the database with publication data."""
-        logger.info(f"Starting enhanced database bootstrap with {len(publication_ids)} publications")
+        from app.database import AsyncSessionLocal
+        
+        logger.info("Starting enhanced database bootstrap with %s publications", len(publication_ids))
         
         # Construct URLs
         urls = self.construct_urls(publication_ids)
-        logger.info(f"Constructed {len(urls)} URLs")
+        logger.info("Constructed %s URLs", len(urls))
         
         # Process in batches
         for i in range(0, len(urls), batch_size):
             batch = urls[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(urls) + batch_size - 1)//batch_size}")
+            logger.info("Processing batch %s/%s", i//batch_size + 1, (len(urls) + batch_size - 1)//batch_size)
             
-            # Process batch concurrently
-            tasks = [self.process_publication(url_info) for url_info in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # One session per batch for the existence check and all inserts
+            async with AsyncSessionLocal() as db:
+                try:
+                    existing_ids = await self.find_existing_publications(db, [url_info.id for url_info in batch])
+                except Exception as e:
+                    # Only this batch fails; the remaining batches still run
+                    logger.error("Error checking existing publications: %s", e)
+                    results = [{'status': 'error', 'id': url_info.id} for url_info in batch]
+                else:
+                    for pub_id in existing_ids:
+                        logger.info("Publication %s already exists, skipping", pub_id)
+                    
+                    # Fetch and parse the batch concurrently (no database access)
+                    tasks = [self.process_publication(url_info) for url_info in batch if url_info.id not in existing_ids]
+                    results = await asyncio.gather(*tasks, return_exceptions=True)
+                    results.extend({'status': 'skipped', 'id': pub_id, 'reason': 'Already exists'} for pub_id in existing_ids)
+                    
+                    parsed = [r for r in results if isinstance(r, dict) and r.get('status') == 'parsed']
+                    if parsed:
+                        await self.store_batch(db, parsed)
             
-            # Log batch results
-            processed = sum(1 for r in results if isinstance(r, dict) and r.get('status') == 'processed')
-            skipped = sum(1 for r in results if isinstance(r, dict) and r.get('status') == 'skipped')
-            errors = sum(1 for r in results if isinstance(r, dict) and r.get('status') == 'error')
+            # Tally and log batch results
+            tally = Counter(r['status'] if isinstance(r, dict) else 'error' for r in results)
+            self._stats.update(tally)
             
-            logger.info(f"Batch completed: {processed} processed, {skipped} skipped, {errors} errors")
+            logger.info(
+                "Batch completed: %s processed, %s skipped, %s non-auction, %s errors",
+                tally['processed'], tally['skipped'], tally['non_auction'], tally['error']
+            )
             
             # Small delay between batches
             if i + batch_size < len(urls):
@@ -212,18 +355,18 @@ class EnhancedDatabaseBootstrap:
         # Final statistics
         stats = {
             'total': len(publication_ids),
-            'processed': self.processed_count,
-            'skipped': self.skipped_count,
-            'non_auction': self.non_auction_count,
-            'errors': self.error_count
+            'processed': self._stats['processed'],
+            'skipped': self._stats['skipped'],
+            'non_auction': self._stats['non_auction'],
+            'errors': self._stats['error']
         }
         
         logger.info("Enhanced bootstrap completed!")
-        logger.info(f"Total: {stats['total']}")
-        logger.info(f"Processed (auctions): {stats['processed']}")
-        logger.info(f"Skipped (already exist): {stats['skipped']}")
-        logger.info(f"Skipped (non-auction): {stats['non_auction']}")
-        logger.info(f"Errors: {stats['errors']}")
+        logger.info("Total: %s", stats['total'])
+        logger.info("Processed (auctions): %s", stats['processed'])
+        logger.info("Skipped (already exist): %s", stats['skipped'])
+        logger.info("Skipped (non-auction): %s", stats['non_auction'])
+        logger.info("Errors: %s", stats['errors'])
         
         return stats
 
@@ -236,18 +379,31 @@ async def main():
         '6048b37e-2062-4bc6-a4d9-66d472f3cc2d', 'c7948b44-cc3a-4496-bd1d-6e30b4df8e9e', '3142634e-cc4e-4696-9f1e-ad674ae784e8', 'b343804b-027d-44db-918e-86e66e1ce470', '324cace7-cca2-4656-8cac-6aad6a6147d6', '851ee2be-e8f5-4c09-bd92-20932f6a960c', 'd2854126-9ccf-45dd-b3e6-f4c00133d4d7', 'f2b72834-7f4c-4700-9d62-d30b2cbf1fb2', '3895b51f-a7a1-4a23-91e2-19c43c001bb4', '70c8b157-ea90-4ce5-812f-6da632b1f206', '451fbddf-c6cb-4352-8b3d-1218d086898a', '35dd5059-4599-4c5f-b95c-762189c50460', 'c5986112-3923-4389-aebe-799dfa4670b2', '107d4bca-df4d-428c-8825-7290e3d23487', '8eced93a-682d-42f8-8c45-cf0fc1a6048e',
     ]
     
+    arg_parser = argparse.ArgumentParser(description="Bootstrap the database from SHAB publications")
+    arg_parser.add_argument(
+        "file",
+        nargs="?",
+        help="File with one publication ID per line (default: built-in example IDs)"
+    )
+    arg_parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="Bulk-load each batch with COPY instead of per-publication ORM inserts"
+    )
+    args = arg_parser.parse_args()
+    
     # You can also read from a file
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
+    if args.file:
+        file_path = args.file
         try:
             with open(file_path, 'r') as f:
                 publication_ids = [line.strip() for line in f if line.strip()]
-            logger.info(f"Loaded {len(publication_ids)} publication IDs from {file_path}")
+            logger.info("Loaded %s publication IDs from %s", len(publication_ids), file_path)
         except FileNotFoundError:
-            logger.error(f"File not found: {file_path}")
+            logger.error("File not found: %s", file_path)
             return
         except Exception as e:
-            logger.error(f"Error reading file: {e}")
+            logger.error("Error reading file: %s", e)
             return
     
     if not publication_ids:
@@ -255,7 +411,7 @@ async def main():
         return
     
     # Create bootstrap instance and run
-    bootstrap = EnhancedDatabaseBootstrap()
+    bootstrap = EnhancedDatabaseBootstrap(use_copy=args.copy)
     stats = await bootstrap.bootstrap_database(publication_ids)
     
     # Print final results
@@ -9,12 +9,11 @@ from datetime import date, timedelta
 # Add the app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.parsers import SHABParser
-from app.tasks.shab_tasks import _process_publication_data
-
 
 async def fetch_and_process_data(days_back: int = 7):
     """Fetch and process SHAB data."""
+    from app.parsers import SHABParser
+    from app.tasks.shab_tasks import _process_publication_data
     
     print(f"Fetching SHAB data for the last {days_back} days...")
     
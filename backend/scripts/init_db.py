@@ -8,11 +8,11 @@ from pathlib import Path
 # Add the app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.database import init_db
-
 
 async def main():
     """Initialize the database."""
+    from app.database import init_db
+    
     print("Initializing database...")
     await init_db()
     print("Database initialized successfully!")
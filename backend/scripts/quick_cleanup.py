@@ -10,12 +10,12 @@ import os
 # Add the parent directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import AsyncSessionLocal
-from sqlalchemy import text
-
 
 async def quick_cleanup():
     """Quick cleanup of test data."""
+    from app.database import AsyncSessionLocal
+    from sqlalchemy import text
+    
     print("🧹 Quick database cleanup...")
     
     async with AsyncSessionLocal() as db:
@@ -56,6 +56,9 @@ async def quick_cleanup():
 
 async def show_stats():
     """Show database statistics."""
+    from app.database import AsyncSessionLocal
+    from sqlalchemy import text
+    
     async with AsyncSessionLocal() as db:
         tables = ['publications', 'auctions', 'auction_objects', 'debtors', 'contacts']
         
@@ -10,11 +10,11 @@ import os
 # Add the parent directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scripts.bootstrap_database import DatabaseBootstrap
-
 
 async def run_bootstrap_with_ids(publication_ids):
     """Run bootstrap with a list of publication IDs."""
+    from scripts.bootstrap_database import DatabaseBootstrap
+    
     bootstrap = DatabaseBootstrap()
     stats = await bootstrap.bootstrap_database(publication_ids, batch_size=3)
     return stats
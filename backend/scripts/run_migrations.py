@@ -8,22 +8,21 @@ from pathlib import Path
 # Add the app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from alembic.config import Config
-from alembic import command
-from app.database import engine
-from app.config import settings
-
 
 async def run_migrations():
     """Run Alembic migrations."""
+    from alembic.config import Config
+    from alembic import command
+    from app.config import settings
     
     # Create Alembic config
     alembic_cfg = Config("alembic.ini")
     alembic_cfg.set_main_option("sqlalchemy.url", settings.database_url)
     
-    # Run migrations
+    # Run migrations on a worker thread; alembic/env.py drives its own
+    # event loop via asyncio.run(), which cannot nest inside ours.
     print("Running database migrations...")
-    command.upgrade(alembic_cfg, "head")
+    await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
     print("Migrations completed successfully!")
 
 
@@ -1,16 +1,36 @@
 """Test configuration and fixtures."""
 
+import os
 import pytest
 import asyncio
+import itertools
+import uuid
+from contextlib import asynccontextmanager
+from freezegun import freeze_time
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.config import settings
+
+# Database tests need an explicit TEST_DATABASE_URL with CREATE DATABASE rights;
+# without it they are skipped rather than run against the app's configured server.
+# Each pytest-xdist worker (gw0, gw1, ...) gets its own PostgreSQL database, and
+# the URL has to be switched before app.database creates its engine.
+ADMIN_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+WORKER_DATABASE_NAME = f"test_{os.environ.get('PYTEST_XDIST_WORKER', 'gw0')}"
+if ADMIN_DATABASE_URL:
+    settings.database_url = make_url(ADMIN_DATABASE_URL).set(
+        database=WORKER_DATABASE_NAME
+    ).render_as_string(hide_password=False)
+
 from app.database import Base, get_db
 from app.main import app
 
 
-# Test database URL (in-memory SQLite for testing)
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+# In-memory SQLite URL for the test_engine/test_db fixtures (not the TEST_DATABASE_URL env var)
+SQLITE_TEST_URL = "sqlite+aiosqlite:///:memory:"
 
 
 @pytest.fixture(scope="session")
@@ -21,11 +41,97 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _verify_model_shape():
+    """Fail the session early if the model relationships are not defined."""
+    from app.models import (
+        Publication, Auction, AuctionObject, Debtor, Contact,
+        UserSubscription, AuctionView
+    )
+    
+    assert all(hasattr(Publication, attr) for attr in ("auctions", "debtors", "contacts"))
+    assert all(hasattr(Auction, attr) for attr in ("auction_objects", "publication"))
+    assert hasattr(AuctionObject, "auction")
+    assert hasattr(Debtor, "publication")
+    assert hasattr(Contact, "publication")
+    assert hasattr(UserSubscription, "auction")
+    assert hasattr(AuctionView, "auction")
+
+
+@pytest.fixture(scope="session")
+async def worker_database():
+    """Create this worker's database with all tables, and drop it afterwards."""
+    if not ADMIN_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    
+    from app.database import engine
+    
+    admin_engine = create_async_engine(ADMIN_DATABASE_URL, isolation_level="AUTOCOMMIT")
+    async with admin_engine.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_DATABASE_NAME}"'))
+        await conn.execute(text(f'CREATE DATABASE "{WORKER_DATABASE_NAME}"'))
+    
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield
+    
+    await engine.dispose()
+    async with admin_engine.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_DATABASE_NAME}"'))
+    await admin_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def warm_pool(worker_database):
+    """Open all of the application engine's pooled connections before the first test."""
+    from app.database import engine
+    
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    # Separate connections, since a single session cannot run queries concurrently
+    await asyncio.gather(*(ping() for _ in range(engine.pool.size())))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def celery_eager():
+    """Run Celery tasks inline against an in-memory broker and result backend."""
+    from app.celery_app import celery_app
+    
+    celery_app.conf.update(
+        task_always_eager=True,
+        task_eager_propagates=True,
+        broker_url="memory://",
+        result_backend="cache+memory://",
+    )
+
+
+@pytest.fixture
+def deterministic_uuids(monkeypatch):
+    """Make uuid.uuid4() return UUID(int=1), UUID(int=2), ... within a test.
+    
+    Only for tests whose rows are rolled back (see async_db); committed rows
+    would collide with the same IDs in the next test.
+    """
+    counter = itertools.count(1)
+    monkeypatch.setattr(uuid, "uuid4", lambda: uuid.UUID(int=next(counter)))
+
+
+@pytest.fixture
+def frozen_today():
+    """Freeze the clock at 2025-09-06, the publication date used in the sample data."""
+    with freeze_time("2025-09-06", real_asyncio=True):
+        yield
+
+
 @pytest.fixture(scope="session")
 async def test_engine():
     """Create test database engine."""
     engine = create_async_engine(
-        TEST_DATABASE_URL,
+        SQLITE_TEST_URL,
         poolclass=StaticPool,
         connect_args={"check_same_thread": False},
         echo=False
@@ -55,6 +161,72 @@ async def test_db(test_engine):
         await session.rollback()
 
 
+@asynccontextmanager
+async def _rolled_back_session():
+    """Yield a session whose commits never leave an outer transaction.
+    
+    The session joins an outer transaction on a dedicated connection, so
+    commits inside it only release SAVEPOINTs and nothing reaches disk.
+    """
+    from app.database import engine
+    
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        )
+        
+        yield session
+        
+        await session.close()
+        await trans.rollback()
+
+
+@pytest.fixture
+async def async_db(warm_pool):
+    """Session on the application database that is rolled back after the test."""
+    async with _rolled_back_session() as session:
+        yield session
+
+
+@pytest.fixture(scope="class")
+async def class_async_db(warm_pool):
+    """Session shared by a test class and rolled back after its last test.
+    
+    For read-mostly classes that seed their rows once; tests must not depend
+    on anything the other tests in the class write.
+    """
+    async with _rolled_back_session() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+async def app_client():
+    """One in-process client for the whole session, with no database behind it.
+    
+    The app lifespan runs once around it. Use it directly for endpoints that
+    never touch the database (health, docs, CORS); everything else goes
+    through asgi_client.
+    """
+    from httpx import ASGITransport, AsyncClient
+    
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as test_client:
+            yield test_client
+
+
+@pytest.fixture(scope="session")
+async def asgi_client(app_client, warm_pool):
+    """The session client, backed by this worker's test database.
+    
+    Modules that need their own database set app.dependency_overrides in a
+    narrower fixture.
+    """
+    return app_client
+
+
 @pytest.fixture
 def client(test_db):
     """Create test client with database dependency override."""
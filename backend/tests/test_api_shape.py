@@ -0,0 +1,108 @@
+"""API response shape tests that run against a mocked database session."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def empty_db():
+    """Mock session for which every query returns no rows."""
+    result = MagicMock()
+    result.scalar.return_value = 0
+    result.scalar_one_or_none.return_value = None
+    result.scalars.return_value.all.return_value = []
+    
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.return_value = result
+    return db
+
+
+@pytest.fixture(scope="module")
+async def client(empty_db):
+    """In-process client whose database is never reached.
+    
+    Deliberately independent of the database-backed session fixtures, so
+    these tests also run without TEST_DATABASE_URL.
+    """
+    app.dependency_overrides[get_db] = lambda: empty_db
+    
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as test_client:
+            yield test_client
+    
+    app.dependency_overrides.pop(get_db, None)
+
+
+class TestAPIShape:
+    """Test response shapes of read-only endpoints."""
+    
+    async def test_auctions_endpoint_structure(self, client):
+        """Test that auctions endpoint returns correct structure."""
+        response = await client.get("/api/v1/auctions/")
+        assert response.status_code == 200
+        
+        data = response.json()
+        required_fields = ["items", "total", "page", "size", "pages"]
+        for field in required_fields:
+            assert field in data, f"Missing field: {field}"
+        
+        # Test pagination structure
+        assert isinstance(data["items"], list)
+        assert isinstance(data["total"], int)
+        assert isinstance(data["page"], int)
+        assert isinstance(data["size"], int)
+        assert isinstance(data["pages"], int)
+    
+    async def test_map_data_endpoint(self, client):
+        """Test map data endpoint."""
+        response = await client.get("/api/v1/auctions/map/data")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert "items" in data
+        assert "total" in data
+        assert isinstance(data["items"], list)
+        assert isinstance(data["total"], int)
+    
+    async def test_subscriptions_pricing(self, client):
+        """Test subscription pricing endpoint."""
+        response = await client.get("/api/v1/subscriptions/pricing")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert "subscription_types" in data
+        
+        subscription_types = data["subscription_types"]
+        assert "basic" in subscription_types
+        assert "premium" in subscription_types
+        
+        # Test basic subscription
+        basic = subscription_types["basic"]
+        assert basic["price"] == "5.00"
+        assert basic["currency"] == "CHF"
+        assert "features" in basic
+        
+        # Test premium subscription
+        premium = subscription_types["premium"]
+        assert premium["price"] == "15.00"
+        assert premium["currency"] == "CHF"
+        assert "features" in premium
+    
+    async def test_api_versioning(self, client):
+        """Test that API versioning is working."""
+        # Test v1 endpoints
+        response = await client.get("/api/v1/auctions/")
+        assert response.status_code == 200
+        
+        # Test that non-versioned endpoints don't exist
+        response = await client.get("/api/auctions/")
+        assert response.status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
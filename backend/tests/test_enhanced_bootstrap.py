@@ -0,0 +1,110 @@
+"""Tests for the enhanced bootstrap script."""
+
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from lxml import etree
+from sqlalchemy import func, select
+
+from app.models import Publication, AuctionObject
+from scripts.enhanced_bootstrap import EnhancedDatabaseBootstrap
+
+
+def _publication(pub_id: uuid.UUID) -> dict:
+    """Parsed publication with one auction object, as returned by the parser."""
+    auction_id = uuid.uuid4()
+    return {
+        "id": pub_id,
+        "publication_date": date(2025, 9, 6),
+        "expiration_date": date(2026, 9, 6),
+        "title": {"de": "Betreibungsamtliche Grundstücksteigerung"},
+        "language": "de",
+        "canton": "ZH",
+        "content": "Test content",
+        "auctions": [
+            {
+                "id": auction_id,
+                "date": date(2025, 10, 15),
+                "location": "Test Location",
+                "auction_objects": [
+                    {
+                        "id": uuid.uuid4(),
+                        "estimated_value": "500000.00",
+                        "latitude": "47.3769",
+                        "longitude": "8.5417"
+                    }
+                ]
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def bootstrap():
+    """Bootstrap in COPY mode with fresh result statistics."""
+    return EnhancedDatabaseBootstrap(use_copy=True)
+
+
+@pytest.mark.parametrize(
+    "xml, expected",
+    [
+        ('<SB01:publication xmlns:SB01="https://shab.ch/shab/SB01-export"/>', "SB01"),
+        ('<HR01:publication xmlns:HR01="https://shab.ch/shab/HR01-export"/>', "HR01"),
+        ('<publication xmlns="https://shab.ch/shab/HR02-export"/>', "HR02"),
+        ('<publication/>', "UNKNOWN"),
+    ],
+    ids=["auction", "hr01", "default-namespace", "no-namespace"]
+)
+def test_detect_publication_type(bootstrap, xml, expected):
+    """Test that the publication type comes from the root export namespace."""
+    assert bootstrap.detect_publication_type(etree.fromstring(xml)) == expected
+
+
+def test_construct_urls(bootstrap):
+    """Test ID cleaning, URL construction and rejection of malformed IDs."""
+    pub_id = "6048b37e-2062-4bc6-a4d9-66d472f3cc2d"
+    
+    urls = bootstrap.construct_urls([f" @{pub_id} ", "not-a-uuid"])
+    
+    assert [url.id for url in urls] == [pub_id]
+    assert urls[0].xml == f"https://www.shab.ch/api/v1/publications/{pub_id}/xml"
+    assert urls[0].html == f"https://www.shab.ch/#!/search/publications/detail/{pub_id}"
+    assert bootstrap._stats["error"] == 1
+
+
+async def test_store_batch_falls_back_when_copy_fails(bootstrap, monkeypatch):
+    """Test that a failed COPY batch is stored one publication at a time."""
+    stored = []
+    
+    async def store_publication_data(publication_data, db):
+        stored.append(publication_data["id"])
+        return publication_data["id"] != "conflict"
+    
+    monkeypatch.setattr(bootstrap, "copy_publication_batch", AsyncMock(return_value=False))
+    monkeypatch.setattr(bootstrap, "store_publication_data", store_publication_data)
+    
+    parsed = [{"status": "parsed", "id": pub_id, "data": {"id": pub_id}} for pub_id in ("a", "conflict")]
+    await bootstrap.store_batch(AsyncMock(), parsed)
+    
+    assert stored == ["a", "conflict"]
+    assert [r["status"] for r in parsed] == ["processed", "error"]
+
+
+async def test_copy_publication_batch_dedupes_ids(bootstrap, async_db):
+    """Test that a publication repeated within a batch is copied once."""
+    pub_id = uuid.uuid4()
+    publication = _publication(pub_id)
+    
+    assert await bootstrap.copy_publication_batch(async_db, [publication, publication])
+    
+    pub_count = await async_db.scalar(
+        select(func.count()).select_from(Publication).where(Publication.id == pub_id)
+    )
+    assert pub_count == 1
+    
+    obj = await async_db.scalar(
+        select(AuctionObject).where(AuctionObject.id == publication["auctions"][0]["auction_objects"][0]["id"])
+    )
+    assert obj.latitude == Decimal("47.3769")
@@ -1,91 +1,57 @@
 """Integration tests to verify the complete system works end-to-end."""
 
+import asyncio
 import pytest
 import uuid
 from datetime import date
-from fastapi.testclient import TestClient
-
-from app.main import app
 
 
 class TestSystemIntegration:
     """Test complete system integration."""
     
     @pytest.fixture
-    def client(self):
-        """Create test client."""
-        return TestClient(app)
+    def client(self, asgi_client):
+        """Use the session's in-process client against the real database.
+        
+        Tests of endpoints that never query the database take app_client
+        instead, so they also run without TEST_DATABASE_URL.
+        """
+        return asgi_client
     
-    def test_api_health_check(self, client):
+    async def test_api_health_check(self, app_client):
         """Test that the API is running and healthy."""
-        response = client.get("/health")
+        response = await app_client.get("/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
         assert data["service"] == "auction-platform"
     
-    def test_api_documentation(self, client):
+    async def test_api_documentation(self, app_client):
         """Test that API documentation is accessible."""
-        response = client.get("/docs")
+        response = await app_client.get("/openapi.json")
+        assert response.status_code == 200
+        assert "paths" in response.json()
+        
+        # HEAD is enough to check the doc pages are served
+        response = await app_client.head("/docs")
         assert response.status_code == 200
         
-        response = client.get("/redoc")
+        response = await app_client.head("/redoc")
         assert response.status_code == 200
     
-    def test_root_endpoint(self, client):
+    async def test_root_endpoint(self, app_client):
         """Test root endpoint."""
-        response = client.get("/")
+        response = await app_client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
         assert "version" in data
         assert "docs" in data
     
-    def test_auctions_endpoint_structure(self, client):
-        """Test that auctions endpoint returns correct structure."""
-        response = client.get("/api/v1/auctions/")
-        assert response.status_code == 200
-        
-        data = response.json()
-        required_fields = ["items", "total", "page", "size", "pages"]
-        for field in required_fields:
-            assert field in data, f"Missing field: {field}"
-        
-        # Test pagination structure
-        assert isinstance(data["items"], list)
-        assert isinstance(data["total"], int)
-        assert isinstance(data["page"], int)
-        assert isinstance(data["size"], int)
-        assert isinstance(data["pages"], int)
-    
-    def test_subscriptions_pricing(self, client):
-        """Test subscription pricing endpoint."""
-        response = client.get("/api/v1/subscriptions/pricing")
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert "subscription_types" in data
-        
-        subscription_types = data["subscription_types"]
-        assert "basic" in subscription_types
-        assert "premium" in subscription_types
-        
-        # Test basic subscription
-        basic = subscription_types["basic"]
-        assert basic["price"] == "5.00"
-        assert basic["currency"] == "CHF"
-        assert "features" in basic
-        
-        # Test premium subscription
-        premium = subscription_types["premium"]
-        assert premium["price"] == "15.00"
-        assert premium["currency"] == "CHF"
-        assert "features" in premium
-    
-    def test_analytics_endpoints(self, client):
+    async def test_analytics_endpoints(self, client):
         """Test analytics endpoints."""
         # Test view statistics
-        response = client.get("/api/v1/analytics/view-statistics")
+        response = await client.get("/api/v1/analytics/view-statistics")
         assert response.status_code == 200
         
         data = response.json()
@@ -97,54 +63,44 @@ class TestSystemIntegration:
             assert field in data, f"Missing field: {field}"
         
         # Test popular auctions
-        response = client.get("/api/v1/analytics/popular-auctions")
+        response = await client.get("/api/v1/analytics/popular-auctions")
         assert response.status_code == 200
         
         data = response.json()
         assert isinstance(data, list)
     
-    def test_map_data_endpoint(self, client):
-        """Test map data endpoint."""
-        response = client.get("/api/v1/auctions/map/data")
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert "items" in data
-        assert "total" in data
-        assert isinstance(data["items"], list)
-        assert isinstance(data["total"], int)
-    
-    def test_authentication_headers(self, client):
+    async def test_authentication_headers(self, client):
         """Test that authentication headers are properly handled."""
         user_id = str(uuid.uuid4())
         
         # Test with valid user ID
-        response = client.get(
+        response = await client.get(
             "/api/v1/analytics/my-view-history",
             headers={"X-User-ID": user_id}
         )
         assert response.status_code == 200
         
         # Test with invalid user ID format
-        response = client.get(
+        response = await client.get(
             "/api/v1/analytics/my-view-history",
             headers={"X-User-ID": "invalid-uuid"}
         )
         assert response.status_code == 400
         
         # Test without user ID
-        response = client.get("/api/v1/analytics/my-view-history")
+        response = await client.get("/api/v1/analytics/my-view-history")
         assert response.status_code == 401
     
-    def test_subscription_workflow(self, client):
+    async def test_subscription_workflow(self, client):
         """Test complete subscription workflow."""
         user_id = str(uuid.uuid4())
         auction_id = str(uuid.uuid4())
+        headers = {"X-User-ID": user_id}
         
         # 1. Check subscription (should not exist)
-        response = client.get(
+        response = await client.get(
             f"/api/v1/subscriptions/check/{auction_id}",
-            headers={"X-User-ID": user_id}
+            headers=headers
         )
         assert response.status_code == 200
         
@@ -159,10 +115,10 @@ class TestSystemIntegration:
             "amount": "15.00"
         }
         
-        response = client.post(
+        response = await client.post(
             "/api/v1/subscriptions/purchase",
             json=subscription_data,
-            headers={"X-User-ID": user_id}
+            headers=headers
         )
         assert response.status_code == 200
         
@@ -170,49 +126,48 @@ class TestSystemIntegration:
         assert "subscription_id" in data
         assert data["status"] == "completed"
         
-        # 3. Check subscription again (should exist now)
-        response = client.get(
-            f"/api/v1/subscriptions/check/{auction_id}",
-            headers={"X-User-ID": user_id}
+        # 3. + 4. Check the subscription and list the user's subscriptions
+        # concurrently; both only read what the purchase wrote
+        check_response, list_response = await asyncio.gather(
+            client.get(f"/api/v1/subscriptions/check/{auction_id}", headers=headers),
+            client.get("/api/v1/subscriptions/my-subscriptions", headers=headers)
         )
-        assert response.status_code == 200
         
-        data = response.json()
+        assert check_response.status_code == 200
+        data = check_response.json()
         assert data["has_subscription"] is True
         assert data["subscription_type"] == "premium"
         
-        # 4. Get user's subscriptions
-        response = client.get(
-            "/api/v1/subscriptions/my-subscriptions",
-            headers={"X-User-ID": user_id}
-        )
-        assert response.status_code == 200
-        
-        data = response.json()
+        assert list_response.status_code == 200
+        data = list_response.json()
         assert isinstance(data, list)
         assert len(data) >= 1
     
-    def test_error_handling(self, client):
+    async def test_error_handling(self, client):
         """Test error handling for various scenarios."""
-        # Test 404 for non-existent auction
         fake_auction_id = str(uuid.uuid4())
-        response = client.get(f"/api/v1/auctions/{fake_auction_id}/basic")
-        assert response.status_code == 404
+        
+        # The probes are independent, so send them concurrently
+        basic_response, full_response, page_response, size_response = await asyncio.gather(
+            client.get(f"/api/v1/auctions/{fake_auction_id}/basic"),
+            client.get(f"/api/v1/auctions/{fake_auction_id}/full"),
+            client.get("/api/v1/auctions/?page=0"),  # Invalid page
+            client.get("/api/v1/auctions/?size=1000")  # Too large
+        )
+        
+        # Test 404 for non-existent auction
+        assert basic_response.status_code == 404
         
         # Test 404 for non-existent auction full details
-        response = client.get(f"/api/v1/auctions/{fake_auction_id}/full")
-        assert response.status_code in [401, 402, 404]  # Depends on auth
+        assert full_response.status_code in [401, 402, 404]  # Depends on auth
         
         # Test invalid query parameters
-        response = client.get("/api/v1/auctions/?page=0")  # Invalid page
-        assert response.status_code == 422  # Validation error
-        
-        response = client.get("/api/v1/auctions/?size=1000")  # Too large
-        assert response.status_code == 422  # Validation error
+        assert page_response.status_code == 422  # Validation error
+        assert size_response.status_code == 422  # Validation error
     
-    def test_cors_headers(self, client):
+    async def test_cors_headers(self, app_client):
         """Test CORS headers are properly set."""
-        response = client.options("/api/v1/auctions/")
+        response = await app_client.options("/api/v1/auctions/")
         assert response.status_code == 200
         
         # Check CORS headers
@@ -220,25 +175,15 @@ class TestSystemIntegration:
         assert "access-control-allow-methods" in response.headers
         assert "access-control-allow-headers" in response.headers
     
-    def test_content_type_headers(self, client):
+    async def test_content_type_headers(self, client):
         """Test that responses have correct content type."""
-        response = client.get("/api/v1/auctions/")
+        response = await client.get("/api/v1/auctions/?size=1")
         assert response.status_code == 200
         assert "application/json" in response.headers.get("content-type", "")
         
-        response = client.get("/api/v1/subscriptions/pricing")
+        response = await client.get("/api/v1/subscriptions/pricing")
         assert response.status_code == 200
         assert "application/json" in response.headers.get("content-type", "")
-    
-    def test_api_versioning(self, client):
-        """Test that API versioning is working."""
-        # Test v1 endpoints
-        response = client.get("/api/v1/auctions/")
-        assert response.status_code == 200
-        
-        # Test that non-versioned endpoints don't exist
-        response = client.get("/api/auctions/")
-        assert response.status_code == 404
 
 
 class TestDataConsistency:
@@ -275,29 +220,6 @@ class TestDataConsistency:
         
         assert subscription_request.subscription_type == "premium"
         assert subscription_request.amount == "15.00"
-    
-    def test_model_relationships(self):
-        """Test that model relationships are properly defined."""
-        from app.models import (
-            Publication, Auction, AuctionObject, Debtor, Contact,
-            UserSubscription, AuctionView
-        )
-        
-        # Test that relationships exist
-        assert hasattr(Publication, 'auctions')
-        assert hasattr(Publication, 'debtors')
-        assert hasattr(Publication, 'contacts')
-        
-        assert hasattr(Auction, 'auction_objects')
-        assert hasattr(Auction, 'publication')
-        
-        assert hasattr(AuctionObject, 'auction')
-        
-        assert hasattr(Debtor, 'publication')
-        assert hasattr(Contact, 'publication')
-        
-        assert hasattr(UserSubscription, 'auction')
-        assert hasattr(AuctionView, 'auction')
 
 
 if __name__ == "__main__":
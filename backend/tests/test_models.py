@@ -1,72 +1,79 @@
 """Tests for database models."""
 
 import pytest
-from datetime import datetime, date, time
+from datetime import datetime, date
 from decimal import Decimal
 from app.models import Publication, Auction, Debtor, AuctionObject, Contact
 
 
-def test_publication_model():
-    """Test Publication model creation."""
-    pub = Publication(
-        publication_date=datetime.now(),
-        title="Test Publication",
-        language="de",
-        canton="ZH",
-        registration_office="Test Office"
-    )
+@pytest.mark.parametrize(
+    "model_cls, kwargs, checks",
+    [
+        pytest.param(
+            Publication,
+            {
+                "publication_date": datetime.now(),
+                "title": "Test Publication",
+                "language": "de",
+                "canton": "ZH",
+                "registration_office": "Test Office"
+            },
+            [("title", "Test Publication"), ("canton", "ZH"), ("language", "de")],
+            id="publication"
+        ),
+        pytest.param(
+            Auction,
+            {
+                "date": datetime.now(),
+                "location": "Test Location",
+                "auction_type": "Zwangsversteigerung"
+            },
+            [("location", "Test Location"), ("auction_type", "Zwangsversteigerung")],
+            id="auction"
+        ),
+        pytest.param(
+            Debtor,
+            {
+                "name": "Mustermann",
+                "prename": "Max",
+                "date_of_birth": date(1980, 1, 1)
+            },
+            [("name", "Mustermann"), ("prename", "Max"), ("full_name", "Max Mustermann")],
+            id="debtor"
+        ),
+        pytest.param(
+            AuctionObject,
+            {
+                "parcel_number": "123",
+                "estimated_value": Decimal("500000.00"),
+                "surface_area": Decimal("100.50")
+            },
+            [
+                ("parcel_number", "123"),
+                ("estimated_value", Decimal("500000.00")),
+                ("surface_area", Decimal("100.50"))
+            ],
+            id="auction_object"
+        ),
+        pytest.param(
+            Contact,
+            {
+                "name": "Test Contact",
+                "phone": "+41 44 123 45 67",
+                "email": "test@example.com"
+            },
+            [
+                ("name", "Test Contact"),
+                ("phone", "+41 44 123 45 67"),
+                ("email", "test@example.com")
+            ],
+            id="contact"
+        ),
+    ]
+)
+def test_model_construction(model_cls, kwargs, checks):
+    """Test in-memory model creation."""
+    obj = model_cls(**kwargs)
     
-    assert pub.title == "Test Publication"
-    assert pub.canton == "ZH"
-    assert pub.language == "de"
-
-
-def test_auction_model():
-    """Test Auction model creation."""
-    auction = Auction(
-        date=datetime.now(),
-        location="Test Location",
-        auction_type="Zwangsversteigerung"
-    )
-    
-    assert auction.location == "Test Location"
-    assert auction.auction_type == "Zwangsversteigerung"
-
-
-def test_debtor_model():
-    """Test Debtor model creation."""
-    debtor = Debtor(
-        name="Mustermann",
-        prename="Max",
-        date_of_birth=date(1980, 1, 1)
-    )
-    
-    assert debtor.name == "Mustermann"
-    assert debtor.prename == "Max"
-    assert debtor.full_name == "Max Mustermann"
-
-
-def test_auction_object_model():
-    """Test AuctionObject model creation."""
-    obj = AuctionObject(
-        parcel_number="123",
-        estimated_value=Decimal("500000.00"),
-        surface_area=Decimal("100.50")
-    )
-    
-    assert obj.parcel_number == "123"
-    assert obj.estimated_value == Decimal("500000.00")
-    assert obj.surface_area == Decimal("100.50")
-
-
-def test_contact_model():
-    """Test Contact model creation."""
-    contact = Contact(
-        name="Test Contact",
-        phone="+41 44 123 45 67",
-        email="test@example.com"
-    )
-    
-    assert contact.name == "Test Contact"
-    assert contact.phone == "+41 44 123 45 67"
-    assert contact.email == "test@example.com"
+    for attr, expected in checks:
+        assert getattr(obj, attr) == expected, attr
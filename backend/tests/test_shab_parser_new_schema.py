@@ -4,33 +4,248 @@ import pytest
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
-from unittest.mock import patch, MagicMock
+from functools import reduce
+from io import BytesIO
+from operator import getitem
+import httpx
+from lxml import etree
 
 from app.parsers.shab_parser import SHABParser
 
 
+# Publication XML for each test, parsed once per module by the roots fixture.
+_XML = {
+    "multilingual_title": """
+    <publication>
+        <title>
+            <de>Betreibungsamtliche Grundstücksteigerung</de>
+            <fr>Vente aux enchères d'immeubles</fr>
+            <it>Incanto immobiliare</it>
+            <en>Property auction</en>
+        </title>
+    </publication>
+    """,
+    "expiration_date": """
+    <publication>
+        <expirationDate>2026-04-30</expirationDate>
+    </publication>
+    """,
+    "person_debtor": """
+    <publication>
+        <debtor>
+            <person>
+                <prename>Jan Henrik</prename>
+                <name>JEBSEN</name>
+                <countryOfOrigin>
+                    <name>
+                        <de>Norwegen</de>
+                        <fr>Norvège</fr>
+                        <it>Norvegia</it>
+                        <en>Norway</en>
+                    </name>
+                    <isoCode>NO</isoCode>
+                </countryOfOrigin>
+                <dateOfBirth>1961-02-09</dateOfBirth>
+                <residence>
+                    <selectType>switzerland</selectType>
+                </residence>
+                <addressSwitzerland>
+                    <street>Chemin des Chanoz</street>
+                    <houseNumber>5</houseNumber>
+                    <swissZipCode>1299</swissZipCode>
+                    <town>Crans VD</town>
+                </addressSwitzerland>
+            </person>
+        </debtor>
+    </publication>
+    """,
+    "company_debtor": """
+    <publication>
+        <debtor>
+            <company>
+                <name>Foncière Immobilière Nord Bernoise SA</name>
+                <uid>CHE-175.482.480</uid>
+                <uidOrganisationId>175482480</uidOrganisationId>
+                <uidOrganisationIdCategorie>CHE</uidOrganisationIdCategorie>
+                <legalForm>0106</legalForm>
+                <address>
+                    <addressLine1>Berney Associés Fribourg SA</addressLine1>
+                    <street>Boulevard de Pérolles</street>
+                    <houseNumber>37</houseNumber>
+                    <swissZipCode>1700</swissZipCode>
+                    <town>Fribourg</town>
+                </address>
+                <canton>FR</canton>
+            </company>
+        </debtor>
+    </publication>
+    """,
+    "circulation_and_registration": """
+    <publication>
+        <auctions>
+            <auction>
+                <circulation>
+                    <entryDeadline>2025-05-20</entryDeadline>
+                    <commentEntryDeadline>(Valeur dates des enchères)</commentEntryDeadline>
+                </circulation>
+                <registration>
+                    <entryDeadline>2025-06-16</entryDeadline>
+                    <commentEntryDeadline>jusqu'au 26.06.2025. L'état des charges, les conditions de vente, le rapport d'expertise pourront être consultés du 16.06.2025 au 26.06.2025.</commentEntryDeadline>
+                </registration>
+            </auction>
+        </auctions>
+    </publication>
+    """,
+    "auction_objects_as_string": """
+    <publication>
+        <auctions>
+            <auction>
+                <auctionObjects>
+                    <p>Commune de Vex :</p>
+                    <p>Parcelle No 4687, plan No 9, nom local "Mayens des Plans", surface totale de 1'469 m2, soit un bâtiment de 69 m2, une forêt dense / forêt de 177m2 et un pré, champ de 1'223 m2</p>
+                    <p>Estimation officielle : Fr. 342'000.00</p>
+                </auctionObjects>
+            </auction>
+        </auctions>
+    </publication>
+    """,
+    "prefetched_contacts": """
+    <publication>
+        <id>abc-123</id>
+        <publicationDate>2025-09-05</publicationDate>
+        <title><de>Test</de></title>
+        <canton>VS</canton>
+    </publication>
+    """,
+    "complete_publication": """
+    <publication>
+        <id>bb0b8622-803e-413e-8d71-bb6da17f5b0c</id>
+        <publicationDate>2025-09-05</publicationDate>
+        <expirationDate>2026-09-05</expirationDate>
+        <title>
+            <de>Betreibungsamtliche Grundstücksteigerung Blaise Blein</de>
+            <en>Property auction initiated by the debt enforcement office Blaise Blein</en>
+            <it>Incanto immobiliare Blaise Blein</it>
+            <fr>Vente aux enchères d'immeubles dans le cadre de la poursuite Blaise Blein</fr>
+        </title>
+        <language>fr</language>
+        <canton>VS</canton>
+        <registrationOffice>
+            <id>4095950d-a5d2-11e8-99a2-0050569d3c43</id>
+            <displayName>Office des poursuites des districts de Sion, Hérens et Conthey</displayName>
+            <street>Rue de la Piscine</street>
+            <streetNumber>10</streetNumber>
+            <swissZipCode>1950</swissZipCode>
+            <town>Sion</town>
+            <containsPostOfficeBox>false</containsPostOfficeBox>
+        </registrationOffice>
+        <auctions>
+            <auction>
+                <id>6c8521f9-55c9-4bca-99cf-f65fb72a9143</id>
+                <date>2025-10-23</date>
+                <time>11:00:00</time>
+                <location>au Café de la Place, Place du Cotterd 1, 1981 Vex</location>
+                <circulation>
+                    <entryDeadline>2025-09-25</entryDeadline>
+                    <commentEntryDeadline>(Valeur dates des enchères)</commentEntryDeadline>
+                </circulation>
+                <registration>
+                    <entryDeadline>2025-10-03</entryDeadline>
+                    <commentEntryDeadline>jusqu'au 26.06.2025</commentEntryDeadline>
+                </registration>
+                <auctionObjects>
+                    <p>Commune de Vex :</p>
+                    <p>Parcelle No 4687, plan No 9, nom local "Mayens des Plans", surface totale de 1'469 m2, soit un bâtiment de 69 m2, une forêt dense / forêt de 177m2 et un pré, champ de 1'223 m2</p>
+                    <p>Estimation officielle : Fr. 342'000.00</p>
+                </auctionObjects>
+            </auction>
+        </auctions>
+        <debtors>
+            <debtor>
+                <person>
+                    <prename>Blaise</prename>
+                    <name>Blein</name>
+                    <dateOfBirth>1964-10-15</dateOfBirth>
+                    <residence>
+                        <selectType>switzerland</selectType>
+                    </residence>
+                    <addressSwitzerland>
+                        <street>Rue du Port</street>
+                        <houseNumber>25</houseNumber>
+                        <swissZipCode>1815</swissZipCode>
+                        <town>Clarens</town>
+                    </addressSwitzerland>
+                </person>
+            </debtor>
+        </debtors>
+    </publication>
+    """
+}
+
+# Whitespace-only text nodes are dropped; the parser skips them anyway.
+_XML_PARSER = etree.XMLParser(
+    remove_blank_text=True,
+    collect_ids=False,
+    resolve_entities=False,
+    no_network=True
+)
+
+# Compiled once instead of on every root.xpath() call; plain tag scans use iter().
+_XP_EXPIRY = etree.XPath('.//expirationDate/text()')
+
+
+# Expected debtor fields keyed by their path into the parsed dict.
+_DEBTOR_CASES = [
+    pytest.param(
+        "person",
+        {
+            ("debtor_type",): "person",
+            ("name",): "JEBSEN",
+            ("prename",): "Jan Henrik",
+            ("date_of_birth",): date(1961, 2, 9),
+            ("country_of_origin", "iso_code"): "NO",
+            ("country_of_origin", "name", "en"): "Norway",
+            ("residence", "select_type"): "switzerland",
+            ("address",): "Chemin des Chanoz 5",
+            ("city",): "Crans VD",
+            ("postal_code",): "1299"
+        },
+        id="person"
+    ),
+    pytest.param(
+        "company",
+        {
+            ("debtor_type",): "company",
+            ("name",): "Foncière Immobilière Nord Bernoise SA",
+            ("legal_form",): "0106",
+            ("address", "street"): "Boulevard de Pérolles",
+            ("address", "house_number"): "37",
+            ("city",): "Fribourg",
+            ("postal_code",): "1700"
+        },
+        id="company"
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """One parser for the module; it keeps no per-document state."""
+    return SHABParser()
+
+
+@pytest.fixture(scope="module")
+def roots():
+    """Parse each XML fixture once for the module."""
+    return {name: etree.fromstring(xml.encode("utf-8"), _XML_PARSER) for name, xml in _XML.items()}
+
+
 class TestSHABParserNewSchema:
     """Test SHAB parser with new schema format."""
     
-    def test_parse_multilingual_title(self):
+    def test_parse_multilingual_title(self, parser, roots):
         """Test parsing multilingual titles."""
-        parser = SHABParser()
-        
-        # Mock XML with multilingual title
-        xml_content = """
-        <publication>
-            <title>
-                <de>Betreibungsamtliche Grundstücksteigerung</de>
-                <fr>Vente aux enchères d'immeubles</fr>
-                <it>Incanto immobiliare</it>
-                <en>Property auction</en>
-            </title>
-        </publication>
-        """
-        
-        # Test the parsing method
-        from lxml import etree
-        root = etree.fromstring(xml_content)
+        root = roots["multilingual_title"]
         
         title = parser._parse_multilingual_title(root)
         
@@ -39,134 +254,27 @@ class TestSHABParserNewSchema:
         assert title["it"] == "Incanto immobiliare"
         assert title["en"] == "Property auction"
     
-    def test_parse_expiration_date(self):
+    def test_parse_expiration_date(self, parser, roots):
         """Test parsing expiration date."""
-        parser = SHABParser()
+        root = roots["expiration_date"]
         
-        xml_content = """
-        <publication>
-            <expirationDate>2026-04-30</expirationDate>
-        </publication>
-        """
-        
-        from lxml import etree
-        root = etree.fromstring(xml_content)
-        
-        expiration_date = parser._parse_date(root.xpath('.//expirationDate/text()'))
+        expiration_date = parser._parse_date(_XP_EXPIRY(root))
         
         assert expiration_date == date(2026, 4, 30)
     
-    def test_parse_person_debtor(self):
-        """Test parsing person debtor with new schema."""
-        parser = SHABParser()
-        
-        xml_content = """
-        <publication>
-            <debtor>
-                <person>
-                    <prename>Jan Henrik</prename>
-                    <name>JEBSEN</name>
-                    <countryOfOrigin>
-                        <name>
-                            <de>Norwegen</de>
-                            <fr>Norvège</fr>
-                            <it>Norvegia</it>
-                            <en>Norway</en>
-                        </name>
-                        <isoCode>NO</isoCode>
-                    </countryOfOrigin>
-                    <dateOfBirth>1961-02-09</dateOfBirth>
-                    <residence>
-                        <selectType>switzerland</selectType>
-                    </residence>
-                    <addressSwitzerland>
-                        <street>Chemin des Chanoz</street>
-                        <houseNumber>5</houseNumber>
-                        <swissZipCode>1299</swissZipCode>
-                        <town>Crans VD</town>
-                    </addressSwitzerland>
-                </person>
-            </debtor>
-        </publication>
-        """
-        
-        from lxml import etree
-        root = etree.fromstring(xml_content)
-        
-        debtor = parser._parse_person_debtor(root.xpath('.//debtor')[0])
-        
-        assert debtor["debtor_type"] == "person"
-        assert debtor["name"] == "JEBSEN"
-        assert debtor["prename"] == "Jan Henrik"
-        assert debtor["date_of_birth"] == date(1961, 2, 9)
-        assert debtor["country_of_origin"]["isoCode"] == "NO"
-        assert debtor["country_of_origin"]["name"]["en"] == "Norway"
-        assert debtor["residence_type"] == "switzerland"
-        assert debtor["address"] == "Chemin des Chanoz 5"
-        assert debtor["city"] == "Crans VD"
-        assert debtor["postal_code"] == "1299"
-    
-    def test_parse_company_debtor(self):
-        """Test parsing company debtor with new schema."""
-        parser = SHABParser()
-        
-        xml_content = """
-        <publication>
-            <debtor>
-                <company>
-                    <name>Foncière Immobilière Nord Bernoise SA</name>
-                    <uid>CHE-175.482.480</uid>
-                    <uidOrganisationId>175482480</uidOrganisationId>
-                    <uidOrganisationIdCategorie>CHE</uidOrganisationIdCategorie>
-                    <legalForm>0106</legalForm>
-                    <address>
-                        <addressLine1>Berney Associés Fribourg SA</addressLine1>
-                        <street>Boulevard de Pérolles</street>
-                        <houseNumber>37</houseNumber>
-                        <swissZipCode>1700</swissZipCode>
-                        <town>Fribourg</town>
-                    </address>
-                    <canton>FR</canton>
-                </company>
-            </debtor>
-        </publication>
-        """
+    @pytest.mark.parametrize("kind, expected", _DEBTOR_CASES)
+    def test_parse_debtor(self, parser, roots, kind, expected):
+        """Test parsing person and company debtors with new schema."""
+        parse = parser._parse_person_debtor if kind == "person" else parser._parse_company_debtor
         
-        from lxml import etree
-        root = etree.fromstring(xml_content)
+        debtor = parse(next(roots[f"{kind}_debtor"].iter('debtor')))
         
-        debtor = parser._parse_company_debtor(root.xpath('.//debtor')[0])
-        
-        assert debtor["debtor_type"] == "company"
-        assert debtor["name"] == "Foncière Immobilière Nord Bernoise SA"
-        assert debtor["legal_form"] == "0106"
-        assert debtor["address"] == "Boulevard de Pérolles 37"
-        assert debtor["city"] == "Fribourg"
-        assert debtor["postal_code"] == "1700"
+        for path, value in expected.items():
+            assert reduce(getitem, path, debtor) == value, path
     
-    def test_parse_circulation_and_registration(self):
+    def test_parse_circulation_and_registration(self, parser, roots):
         """Test parsing circulation and registration deadlines."""
-        parser = SHABParser()
-        
-        xml_content = """
-        <publication>
-            <auctions>
-                <auction>
-                    <circulation>
-                        <entryDeadline>2025-05-20</entryDeadline>
-                        <commentEntryDeadline>(Valeur dates des enchères)</commentEntryDeadline>
-                    </circulation>
-                    <registration>
-                        <entryDeadline>2025-06-16</entryDeadline>
-                        <commentEntryDeadline>jusqu'au 26.06.2025. L'état des charges, les conditions de vente, le rapport d'expertise pourront être consultés du 16.06.2025 au 26.06.2025.</commentEntryDeadline>
-                    </registration>
-                </auction>
-            </auctions>
-        </publication>
-        """
-        
-        from lxml import etree
-        root = etree.fromstring(xml_content)
+        root = roots["circulation_and_registration"]
         
         circulation = parser._parse_circulation(root)
         registration = parser._parse_registration(root)
@@ -177,26 +285,9 @@ class TestSHABParserNewSchema:
         assert registration["entry_deadline"] == date(2025, 6, 16)
         assert "jusqu'au 26.06.2025" in registration["comment_entry_deadline"]
     
-    def test_parse_auction_objects_as_string(self):
+    def test_parse_auction_objects_as_string(self, parser, roots):
         """Test parsing auction objects as string (not structured)."""
-        parser = SHABParser()
-        
-        xml_content = """
-        <publication>
-            <auctions>
-                <auction>
-                    <auctionObjects>
-                        <p>Commune de Vex :</p>
-                        <p>Parcelle No 4687, plan No 9, nom local "Mayens des Plans", surface totale de 1'469 m2, soit un bâtiment de 69 m2, une forêt dense / forêt de 177m2 et un pré, champ de 1'223 m2</p>
-                        <p>Estimation officielle : Fr. 342'000.00</p>
-                    </auctionObjects>
-                </auction>
-            </auctions>
-        </publication>
-        """
-        
-        from lxml import etree
-        root = etree.fromstring(xml_content)
+        root = roots["auction_objects_as_string"]
         
         auction_objects = parser._parse_auction_objects(root)
         
@@ -212,10 +303,8 @@ class TestSHABParserNewSchema:
         assert obj["estimated_value"] is None
         assert obj["surface_area"] is None
     
-    def test_parse_contacts_from_json_api(self):
+    def test_parse_contacts_from_json_api(self, parser):
         """Test parsing contacts from JSON API."""
-        parser = SHABParser()
-        
         # Mock JSON response
         json_content = """
         {
@@ -246,10 +335,8 @@ class TestSHABParserNewSchema:
         assert contact["office_id"] == "4095950d-a5d2-11e8-99a2-0050569d3c43"
         assert contact["contains_post_office_box"] is False
     
-    def test_parse_contacts_with_post_office_box(self):
+    def test_parse_contacts_with_post_office_box(self, parser):
         """Test parsing contacts with post office box."""
-        parser = SHABParser()
-        
         json_content = """
         {
             "meta": {
@@ -281,94 +368,43 @@ class TestSHABParserNewSchema:
         assert contact["post_office_box"]["zipCode"] == "8001"
         assert contact["post_office_box"]["town"] == "Zurich"
     
-    @patch('app.parsers.shab_parser.httpx.Client')
-    def test_fetch_url_data(self, mock_client):
+    def test_parse_xml_with_prefetched_contacts(self, parser, monkeypatch):
+        """Test that pre-fetched contacts JSON is used without another fetch."""
+        assert parser.get_contacts_json_url(
+            "https://www.shab.ch/api/v1/publications/abc-123/xml"
+        ) == "https://www.shab.ch/api/v1/publications/abc-123"
+        assert parser.get_contacts_json_url(
+            "https://www.shab.ch/#!/search/publications/detail/abc-123"
+        ) == "https://www.shab.ch/api/v1/publications/abc-123"
+        
+        json_content = '{"meta": {"registrationOffice": {"displayName": "Test Office", "town": "Sion"}}}'
+        
+        fetched = []
+        monkeypatch.setattr(parser, "fetch_url_data", fetched.append)
+        
+        publications = parser.parse_xml(_XML["prefetched_contacts"], contacts_json=json_content)
+        
+        assert fetched == []
+        assert len(publications) == 1
+        assert publications[0]["contacts"][0]["name"] == "Test Office"
+    
+    def test_fetch_url_data(self):
         """Test fetching data from URL."""
-        parser = SHABParser()
+        requests = []
         
-        # Mock HTTP response
-        mock_response = MagicMock()
-        mock_response.text = "Test content"
-        mock_response.raise_for_status.return_value = None
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text="Test content")
         
-        mock_client_instance = MagicMock()
-        mock_client_instance.get.return_value = mock_response
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        parser = SHABParser(client=httpx.Client(transport=httpx.MockTransport(handler)))
         
         result = parser.fetch_url_data("https://test.com")
         
         assert result == "Test content"
-        mock_client_instance.get.assert_called_once_with("https://test.com")
+        assert [(r.method, r.url.host) for r in requests] == [("GET", "test.com")]
     
-    def test_parse_complete_publication(self):
+    def test_parse_complete_publication(self, parser, monkeypatch):
         """Test parsing a complete publication with all new fields."""
-        parser = SHABParser()
-        
-        # Mock complete XML
-        xml_content = """
-        <publication>
-            <id>bb0b8622-803e-413e-8d71-bb6da17f5b0c</id>
-            <publicationDate>2025-09-05</publicationDate>
-            <expirationDate>2026-09-05</expirationDate>
-            <title>
-                <de>Betreibungsamtliche Grundstücksteigerung Blaise Blein</de>
-                <en>Property auction initiated by the debt enforcement office Blaise Blein</en>
-                <it>Incanto immobiliare Blaise Blein</it>
-                <fr>Vente aux enchères d'immeubles dans le cadre de la poursuite Blaise Blein</fr>
-            </title>
-            <language>fr</language>
-            <canton>VS</canton>
-            <registrationOffice>
-                <id>4095950d-a5d2-11e8-99a2-0050569d3c43</id>
-                <displayName>Office des poursuites des districts de Sion, Hérens et Conthey</displayName>
-                <street>Rue de la Piscine</street>
-                <streetNumber>10</streetNumber>
-                <swissZipCode>1950</swissZipCode>
-                <town>Sion</town>
-                <containsPostOfficeBox>false</containsPostOfficeBox>
-            </registrationOffice>
-            <auctions>
-                <auction>
-                    <id>6c8521f9-55c9-4bca-99cf-f65fb72a9143</id>
-                    <date>2025-10-23</date>
-                    <time>11:00:00</time>
-                    <location>au Café de la Place, Place du Cotterd 1, 1981 Vex</location>
-                    <circulation>
-                        <entryDeadline>2025-09-25</entryDeadline>
-                        <commentEntryDeadline>(Valeur dates des enchères)</commentEntryDeadline>
-                    </circulation>
-                    <registration>
-                        <entryDeadline>2025-10-03</entryDeadline>
-                        <commentEntryDeadline>jusqu'au 26.06.2025</commentEntryDeadline>
-                    </registration>
-                    <auctionObjects>
-                        <p>Commune de Vex :</p>
-                        <p>Parcelle No 4687, plan No 9, nom local "Mayens des Plans", surface totale de 1'469 m2, soit un bâtiment de 69 m2, une forêt dense / forêt de 177m2 et un pré, champ de 1'223 m2</p>
-                        <p>Estimation officielle : Fr. 342'000.00</p>
-                    </auctionObjects>
-                </auction>
-            </auctions>
-            <debtors>
-                <debtor>
-                    <person>
-                        <prename>Blaise</prename>
-                        <name>Blein</name>
-                        <dateOfBirth>1964-10-15</dateOfBirth>
-                        <residence>
-                            <selectType>switzerland</selectType>
-                        </residence>
-                        <addressSwitzerland>
-                            <street>Rue du Port</street>
-                            <houseNumber>25</houseNumber>
-                            <swissZipCode>1815</swissZipCode>
-                            <town>Clarens</town>
-                        </addressSwitzerland>
-                    </person>
-                </debtor>
-            </debtors>
-        </publication>
-        """
-        
         # Mock JSON API response for contacts
         json_content = """
         {
@@ -386,8 +422,10 @@ class TestSHABParserNewSchema:
         }
         """
         
-        with patch.object(parser, 'fetch_url_data', return_value=json_content):
-            publications = parser.parse_xml(xml_content, "https://test.com")
+        # The parser is shared by the module, so the stub must be undone afterwards
+        monkeypatch.setattr(parser, "fetch_url_data", lambda _url: json_content)
+        
+        publications = parser.parse_xml(_XML["complete_publication"], "https://test.com")
         
         assert len(publications) == 1
         pub = publications[0]
@@ -437,7 +475,34 @@ class TestSHABParserNewSchema:
         assert contact["postal_code"] == "1950"
         assert contact["city"] == "Sion"
         assert contact["contact_type"] == "office"
-
+    
+    def test_parse_complete_publication_streamed(self, parser):
+        """Test parsing a publication element yielded by iterparse."""
+        publications = []
+        events = etree.iterparse(
+            BytesIO(_XML["complete_publication"].encode("utf-8")),
+            events=("end",),
+            tag="publication",
+            remove_blank_text=True
+        )
+        
+        for _, elem in events:
+            assert _XP_EXPIRY(elem) == ["2026-09-05"]
+            assert len(list(elem.iter('debtor'))) == 1
+            
+            publications.extend(parser.parse_xml("", root=elem))
+            
+            # Free the processed element the way a streaming import would
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        
+        assert len(publications) == 1
+        pub = publications[0]
+        assert pub["id"] == "bb0b8622-803e-413e-8d71-bb6da17f5b0c"
+        assert pub["expiration_date"] == date(2026, 9, 5)
+        assert pub["auctions"][0]["date"] == date(2025, 10, 23)
+        assert pub["debtors"][0]["name"] == "Blein"
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])